@@ -35,17 +35,27 @@ class Settings(BaseSettings):
     # Retrieval backend toggles
     use_bm25: bool = Field(default=False, alias="USE_BM25")
     bm25_index_dir: str = Field(default="./data/bm25", alias="BM25_INDEX_DIR")
+    # Per-retriever multipliers on the RRF contribution (1.0/1.0 = plain RRF)
+    rrf_vector_weight: float = Field(default=1.0, alias="RRF_VECTOR_WEIGHT")
+    rrf_bm25_weight: float = Field(default=1.0, alias="RRF_BM25_WEIGHT")
     use_reranker: bool = Field(default=False, alias="USE_RERANKER")
     reranker_model: str = Field(
         default="cross-encoder/ms-marco-MiniLM-L-6-v2",
         alias="RERANKER_MODEL",
     )
+    # In-process cache of final search results.  invalidate_results() only
+    # reaches the worker that handled a write, so other workers could serve
+    # removed chunks until the TTL expires: enable only with a single process.
+    search_result_cache: bool = Field(default=False, alias="SEARCH_RESULT_CACHE")
 
     # JWT configuration
     jwt_secret: str = Field(alias="JWT_SECRET")
     access_token_expire_minutes: int = Field(
         default=60, alias="ACCESS_TOKEN_EXPIRE_MINUTES"
     )
+    # bcrypt cost factor (work is 2**rounds, bcrypt accepts 4-31); values
+    # below 10 are for tests only and log a warning at startup
+    password_hash_rounds: int = Field(default=12, ge=4, le=31, alias="PASSWORD_HASH_ROUNDS")
 
     # CORS settings (comma-separated list)
     allowed_origins: str = Field(
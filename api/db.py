@@ -9,6 +9,7 @@ from __future__ import annotations
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
 
 from .config import settings
 
@@ -17,11 +18,18 @@ from .config import settings
 # check_same_thread=False when used in a multi‑threaded application like
 # FastAPI (uvicorn).  Other databases can omit this argument.
 connect_args: dict[str, object] = {}
+engine_kwargs: dict[str, object] = {}
 if settings.sql_database_uri.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
+    # An in-memory database only lives as long as its connection, so every
+    # session has to share a single one (used by the test suite).
+    if settings.sql_database_uri in ("sqlite://", "sqlite:///:memory:"):
+        engine_kwargs["poolclass"] = StaticPool
 
 # Create the SQLAlchemy engine and session factory.
-engine = create_engine(settings.sql_database_uri, connect_args=connect_args)
+engine = create_engine(
+    settings.sql_database_uri, connect_args=connect_args, **engine_kwargs
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base class for models to inherit from.
@@ -1,17 +1,90 @@
 from __future__ import annotations
 
-"""Logging utilities for user queries and feedback."""
+"""Logging utilities for user queries and feedback.
 
+Entries are queued and appended by a background thread, started on the first
+entry, so request handlers never wait on the filesystem unless the bounded
+queue is full; call :func:`flush` to wait for pending writes.
+"""
+
+import atexit
 import datetime as dt
 import json
 import os
+import queue
+import threading
 from pathlib import Path
+from typing import Optional
 from .middleware.correlation import request_id_ctx
 
 LOG_DIR = Path(os.getenv("LOGS_DIR", "logs"))
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 LOG_FILE = LOG_DIR / "queries.log"
 
+# Bounded so a slow disk cannot grow memory without limit; when it is full
+# the request writes its entry inline instead.
+_QUEUE: "queue.Queue[str]" = queue.Queue(maxsize=10_000)
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+
+def _append(text: str) -> None:
+    try:
+        with LOG_FILE.open("a", encoding="utf-8") as f:
+            f.write(text)
+    except Exception:
+        pass
+
+
+def _drain(q: "queue.Queue[str]") -> None:
+    # Block for one entry, then take whatever else is already queued so a
+    # burst of requests costs one open/write instead of one per entry.
+    while True:
+        batch = [q.get()]
+        while True:
+            try:
+                batch.append(q.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            _append("".join(batch))
+        finally:
+            for _ in batch:
+                q.task_done()
+
+
+def _ensure_writer() -> None:
+    # Started on first use rather than at import, so importing the module
+    # (tests, tooling) does not spawn a thread.
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(
+                    target=_drain, args=(_QUEUE,), name="query-log-writer", daemon=True
+                )
+                _writer.start()
+
+
+def flush() -> None:
+    """Block until every queued entry has been written."""
+    _QUEUE.join()
+
+
+atexit.register(flush)
+
+
+def _write(entry: dict) -> None:
+    try:
+        line = json.dumps(entry) + "\n"
+    except Exception:
+        return
+    _ensure_writer()
+    try:
+        _QUEUE.put_nowait(line)
+    except queue.Full:
+        _append(line)
+
 
 def log_query(query_id: int, user_id: int, question: str, answer: str) -> None:
     entry = {
@@ -22,11 +95,7 @@ def log_query(query_id: int, user_id: int, question: str, answer: str) -> None:
         "answer": answer,
         "request_id": request_id_ctx.get(None),
     }
-    try:
-        with LOG_FILE.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry) + "\n")
-    except Exception:
-        pass
+    _write(entry)
 
 
 def log_feedback(query_id: int, user_id: int, feedback: str) -> None:
@@ -37,8 +106,4 @@ def log_feedback(query_id: int, user_id: int, feedback: str) -> None:
         "feedback": feedback,
         "request_id": request_id_ctx.get(None),
     }
-    try:
-        with LOG_FILE.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry) + "\n")
-    except Exception:
-        pass
+    _write(entry)
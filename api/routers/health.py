@@ -11,7 +11,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from ..deps import get_db
-from rag.retriever import get_chroma_client
+from rag.embeddings import embedding_cache_stats
+from rag.retriever import get_chroma_client, result_cache_stats
 
 router = APIRouter(prefix="/api", tags=["health"])
 
@@ -76,6 +77,10 @@ def health_details(db: Session = Depends(get_db)):
         "database": db_ok,
         "chroma": chroma_ok,
         "status": "ok" if (db_ok and chroma_ok) else "degraded",
+        "caches": {
+            "search_results": result_cache_stats(),
+            "embeddings": embedding_cache_stats(),
+        },
     }
     if db_ok and chroma_ok:
         return payload
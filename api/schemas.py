@@ -7,10 +7,31 @@ generation with FastAPI.
 """
 from __future__ import annotations
 
+import re
 from typing import Optional, List, Literal
 from datetime import datetime
 from pydantic import BaseModel, Field, EmailStr, field_validator
 
+# Password complexity checks, compiled once.  "Digit or symbol" is simply any
+# character that is not an ASCII letter.
+PASSWORD_MIN_LENGTH = 12
+_UPPER_RE = re.compile(r"[A-Z]")
+_LOWER_RE = re.compile(r"[a-z]")
+_DIGIT_OR_SYMBOL_RE = re.compile(r"[^A-Za-z]")
+
+
+def password_problem(password: str) -> Optional[str]:
+    """Return why ``password`` fails the complexity policy, or None if it passes."""
+    if len(password) < PASSWORD_MIN_LENGTH:
+        return f"must be at least {PASSWORD_MIN_LENGTH} characters"
+    if not _UPPER_RE.search(password):
+        return "must include an uppercase letter"
+    if not _LOWER_RE.search(password):
+        return "must include a lowercase letter"
+    if not _DIGIT_OR_SYMBOL_RE.search(password):
+        return "must include a digit or symbol"
+    return None
+
 
 class Token(BaseModel):
     access_token: str
@@ -40,19 +61,15 @@ class UserBase(BaseModel):
 
 
 class UserCreate(UserBase):
-    password: str = Field(..., min_length=12)
+    password: str = Field(..., min_length=PASSWORD_MIN_LENGTH)
     active: bool = True
 
     @field_validator("password")
     @classmethod
     def check_strength(cls, v: str) -> str:
-        import re
-        if not re.search(r"[A-Z]", v):
-            raise ValueError("must include an uppercase letter")
-        if not re.search(r"[a-z]", v):
-            raise ValueError("must include a lowercase letter")
-        if not (re.search(r"[0-9]", v) or re.search(r"[^A-Za-z0-9]", v)):
-            raise ValueError("must include a digit or symbol")
+        problem = password_problem(v)
+        if problem:
+            raise ValueError(problem)
         return v
 
 
@@ -6,6 +6,7 @@ verification, and an OAuth2 password bearer scheme for FastAPI endpoints.
 """
 from __future__ import annotations
 
+import logging
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
@@ -19,8 +20,17 @@ from .config import settings
 from .schemas import TokenData
 
 
-# Password hashing context (bcrypt)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context (bcrypt).  Hashes made with another cost factor
+# still verify, so PASSWORD_HASH_ROUNDS can change without a migration.
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.password_hash_rounds
+)
+if settings.password_hash_rounds < 10:
+    logging.getLogger(__name__).warning(
+        "PASSWORD_HASH_ROUNDS=%d is below 10; new password hashes are weak. "
+        "Use a low cost only for tests or local development.",
+        settings.password_hash_rounds,
+    )
 
 # OAuth2 bearer token extraction.  The token will be taken from the Authorization
 # header as "Bearer <token>".
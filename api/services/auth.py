@@ -13,7 +13,6 @@ from fastapi import HTTPException, status
 from .. import models, schemas
 from ..security import verify_password, get_password_hash, create_access_token
 from . import email as email_service
-import re
 
 
 def authenticate_user(db: Session, email: str, password: str) -> Optional[models.User]:
@@ -57,15 +56,7 @@ def create_user(db: Session, user_in: schemas.UserCreate) -> models.User:
 
 
 def _valid_password(password: str) -> bool:
-    if len(password) < 12:
-        return False
-    if not re.search(r"[A-Z]", password):
-        return False
-    if not re.search(r"[a-z]", password):
-        return False
-    if not (re.search(r"[0-9]", password) or re.search(r"[^A-Za-z0-9]", password)):
-        return False
-    return True
+    return schemas.password_problem(password) is None
 
 
 def issue_access_token(user: models.User) -> str:
@@ -100,7 +100,7 @@ def update_collection(
     db.refresh(collection)
 
     # Update collection name in existing embeddings
-    from rag.retriever import get_collection_client
+    from rag.retriever import get_collection_client, invalidate_results
 
     try:
         client = get_collection_client(collection.id)
@@ -118,6 +118,7 @@ def update_collection(
                 m["collection_name"] = collection.name
                 updated.append(m)
             chroma.update(ids=ids, metadatas=updated)
+            invalidate_results(collection.id)
     except Exception:
         pass
     count = (
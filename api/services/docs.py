@@ -22,8 +22,7 @@ from rag import chunker
 
 RAW_DIR = Path(settings.raw_docs_dir)
 RAW_DIR.mkdir(parents=True, exist_ok=True)
-COLL_META_DIR = Path(settings.collections_dir)
-COLL_META_DIR.mkdir(parents=True, exist_ok=True)
+Path(settings.collections_dir).mkdir(parents=True, exist_ok=True)
 
 
 def _set_status(link: models.DocumentCollection) -> None:
@@ -124,7 +123,8 @@ def _ensure_chunk_cache(db: Session, blob: models.Blob) -> tuple[int, int]:
 
 
 def _meta_path(collection_id: int, document_id: int) -> Path:
-    return COLL_META_DIR / str(collection_id) / f"{document_id}.json"
+    # Read per call, like the collections router, so a changed setting applies.
+    return Path(settings.collections_dir) / str(collection_id) / f"{document_id}.json"
 
 
 def _write_link_meta(doc: models.Document, link: models.DocumentCollection) -> None:
@@ -165,7 +165,7 @@ def _index_document(
     db.flush()
 
     # --- embed and upsert into Chroma ---
-    from rag.retriever import get_collection_client
+    from rag.retriever import get_collection_client, invalidate_results
     from rag.embeddings import get_embedder
 
     texts = [c.text for c in chunks]
@@ -225,6 +225,9 @@ def _index_document(
         link.status = "failed"
         link.error = str(exc)
         db.commit()
+    finally:
+        # stale vectors were deleted above even if the upsert failed
+        invalidate_results(collection_id)
 
 
 def _async_index_document(doc_id: int, collection_id: int, user_id: int | None = None) -> None:
@@ -406,7 +409,7 @@ def update_document(
     for link in links:
         try:
             _write_link_meta(doc, link)
-            from rag.retriever import get_collection_client
+            from rag.retriever import get_collection_client, invalidate_results
 
             client = get_collection_client(link.collection_id)
             chroma = client.get_or_create_collection(name="docs")
@@ -423,6 +426,7 @@ def update_document(
                     m["title"] = doc.title
                     updated.append(m)
                 chroma.update(ids=ids, metadatas=updated)
+                invalidate_results(link.collection_id)
         except Exception:
             # Ignore vector store failures to avoid blocking rename
             pass
@@ -441,7 +445,7 @@ def unlink_document(
     if not link:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Link not found")
     # Remove vectors for this (document, collection) pair from Chroma
-    from rag.retriever import get_collection_client
+    from rag.retriever import get_collection_client, invalidate_results
 
     client = get_collection_client(collection_id)
     chroma = client.get_or_create_collection(
@@ -451,6 +455,7 @@ def unlink_document(
         chroma.delete(where={"document_id": document_id})
     except Exception:
         pass
+    invalidate_results(collection_id)
 
     # Clear counts so stats stay consistent before removing the link
     link.indexed_embedding_count = 0
@@ -482,7 +487,7 @@ def purge_document(db: Session, document_id: int, user: models.User | None = Non
         return
     blob = doc.blob
     # Remove any vectors for this document across collections
-    from rag.retriever import get_collection_client
+    from rag.retriever import get_collection_client, invalidate_results
 
     # Remove vectors for this document from any collection directory that may exist
     base = Path(settings.chroma_persist_dir)
@@ -498,6 +503,7 @@ def purge_document(db: Session, document_id: int, user: models.User | None = Non
                 coll.delete(where={"document_id": document_id})
             except Exception:
                 pass
+            invalidate_results(cid)
 
     db.delete(doc)
     db.flush()
@@ -506,7 +512,7 @@ def purge_document(db: Session, document_id: int, user: models.User | None = Non
         db.query(models.DocumentChunk).filter_by(blob_id=blob.id).delete()
         db.delete(blob)
     db.commit()
-    meta_base = COLL_META_DIR
+    meta_base = Path(settings.collections_dir)
     if meta_base.exists():
         for file in meta_base.glob(f"*/{document_id}.json"):
             file.unlink(missing_ok=True)
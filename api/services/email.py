@@ -3,9 +3,12 @@
 Records password reset emails for testing purposes."""
 from __future__ import annotations
 
-from typing import List, Dict
+from collections import deque
+from typing import Deque, Dict
 
-sent_emails: List[Dict[str, str]] = []
+# Only the most recent messages are kept so a long-running process does not
+# grow this without bound.
+sent_emails: Deque[Dict[str, str]] = deque(maxlen=1000)
 
 
 def send_password_reset(email: str, token: str) -> None:
@@ -82,18 +82,21 @@ def ask_question(
             "query_id": query_log.id,
         }
 
-    # Load recent conversation for short-term memory
+    # Load recent conversation for short-term memory.  Only the last five
+    # turns are used, so let the database pick them instead of loading the
+    # whole session.
     history_rows = (
         db.query(models.ChatHistory)
         .filter(
             models.ChatHistory.user_id == user.id,
             models.ChatHistory.session_id == session_id,
         )
-        .order_by(models.ChatHistory.created_at.asc())
+        .order_by(models.ChatHistory.created_at.desc(), models.ChatHistory.id.desc())
+        .limit(5)
         .all()
     )
     history = [
-        {"question": h.query, "answer": h.response} for h in history_rows[-5:]
+        {"question": h.query, "answer": h.response} for h in reversed(history_rows)
     ]
 
     # Step 1: rewrite question to improve recall
@@ -1,5 +1,7 @@
 import re
 
+_WORD_RE = re.compile(r"\w+")
+
 
 def generate_session_title(text: str) -> str:
     """Create a short session title from an assistant reply.
@@ -8,7 +10,7 @@ def generate_session_title(text: str) -> str:
     them in Title Case. If no words are found a default placeholder is
     returned.
     """
-    words = re.findall(r"\w+", text)
+    words = _WORD_RE.findall(text)
     if not words:
         return "New Chat"
     count = min(4, len(words))
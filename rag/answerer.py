@@ -22,6 +22,17 @@ from .prompts import (
 # Single shared client
 client = OpenAI(api_key=settings.openai_api_key)
 
+# User-turn templates, specialised once at import so each request only fills
+# in the variable slots.
+_COMPRESSOR_USER_TMPL = "Question:\n{question}\n\nContext:\n{context}"
+_ANSWERER_USER_TMPL = "Context:\n{context}\n\nQuestion: {question}"
+
+# System messages never change after import; share them rather than rebuilding
+# a dict per request.  They are only read when the request is serialised.
+_REWRITER_SYSTEM_MSG = {"role": "system", "content": REWRITER_SYSTEM_PROMPT}
+_COMPRESSOR_SYSTEM_MSG = {"role": "system", "content": COMPRESSOR_SYSTEM_PROMPT}
+_ANSWERER_SYSTEM_MSG = {"role": "system", "content": ANSWERER_SYSTEM_PROMPT}
+
 
 def _safe_label(meta: Dict[str, Any]) -> str:
     """Build a stable citation label like [Title p.N]."""
@@ -35,10 +46,18 @@ def _safe_label(meta: Dict[str, Any]) -> str:
     return f"[{title} p.{page_str}]"
 
 
+def _format_context(contexts: List[Dict[str, Any]]) -> str:
+    """Join context snippets, each prefixed with its citation label."""
+    return "\n\n".join(
+        f"{_safe_label(c.get('metadata', {}) or {})} {c.get('text') or ''}"
+        for c in contexts
+    )
+
+
 def rewrite_question(question: str) -> str:
     """Use the rewriter prompt to improve the user's question for retrieval."""
     messages = [
-        {"role": "system", "content": REWRITER_SYSTEM_PROMPT},
+        _REWRITER_SYSTEM_MSG,
         {"role": "user", "content": question},
     ]
     try:
@@ -63,24 +82,17 @@ def compress_context(question: str, contexts: List[Dict[str, Any]]) -> str:
     If the combined context is short, return the concatenation directly.
     Otherwise, call the compressor prompt while preserving citation labels.
     """
-    # Build a single string of snippets with separators and citation labels
-    snippets: List[str] = []
-    for c in contexts:
-        meta = c.get("metadata", {}) or {}
-        text = c.get("text") or ""
-        label = _safe_label(meta)
-        snippets.append(f"{label} {text}")
-    full_context = "\n\n".join(snippets)
+    full_context = _format_context(contexts)
 
     # If context is short enough, skip compression
     if len(full_context.split()) < 1500:
         return full_context
 
     messages = [
-        {"role": "system", "content": COMPRESSOR_SYSTEM_PROMPT},
+        _COMPRESSOR_SYSTEM_MSG,
         {
             "role": "user",
-            "content": f"Question:\n{question}\n\nContext:\n{full_context}",
+            "content": _COMPRESSOR_USER_TMPL.format(question=question, context=full_context),
         },
     ]
     try:
@@ -115,6 +127,16 @@ def _rank_dedupe(citations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return ordered
 
 
+def _history_messages(history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Flatten question/answer turns into alternating chat messages."""
+    messages: List[Dict[str, str]] = []
+    append = messages.append
+    for turn in history:
+        append({"role": "user", "content": turn["question"]})
+        append({"role": "assistant", "content": turn["answer"]})
+    return messages
+
+
 def generate_answer(
     question: str,
     contexts: List[Dict[str, Any]],
@@ -130,23 +152,15 @@ def generate_answer(
             "latency_ms": int
         }
     """
-    # Concatenate context with labels for citations
-    context_string = "\n\n".join(
-        f"{_safe_label(c.get('metadata', {}) or {})} {c.get('text') or ''}"
-        for c in contexts
-    )
+    context_string = _format_context(contexts)
 
-    messages = [
-        {"role": "system", "content": ANSWERER_SYSTEM_PROMPT}
-    ]
+    messages = [_ANSWERER_SYSTEM_MSG]
     if history:
-        for turn in history:
-            messages.append({"role": "user", "content": turn["question"]})
-            messages.append({"role": "assistant", "content": turn["answer"]})
+        messages.extend(_history_messages(history))
     messages.append(
         {
             "role": "user",
-            "content": f"Context:\n{context_string}\n\nQuestion: {question}",
+            "content": _ANSWERER_USER_TMPL.format(context=context_string, question=question),
         }
     )
 
@@ -5,6 +5,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import List, Dict, Any
 import json
+import threading
 
 from whoosh import index
 from whoosh.fields import Schema, ID, TEXT, STORED, NUMERIC
@@ -29,12 +30,33 @@ def _index_path(collection_id: int) -> Path:
     return _base_dir() / f"coll_{collection_id}"
 
 
+# Opened indexes keyed by directory.  A Whoosh ``FileIndex`` re-reads its
+# table of contents whenever a reader/searcher is created, so a cached handle
+# still sees later commits; caching it skips the mkdir, exists check and TOC
+# parse that ``open_dir`` costs on every query.
+_INDEX_CACHE: Dict[str, Any] = {}
+_INDEX_LOCK = threading.Lock()
+
+# The schema is fixed, so one parser serves every collection.
+_PARSER = QueryParser("text", schema=_schema)
+
+
 def get_or_create_index(collection_id: int):
     path = _index_path(collection_id)
-    path.mkdir(parents=True, exist_ok=True)
-    if index.exists_in(str(path)):
-        return index.open_dir(str(path))
-    return index.create_in(str(path), _schema)
+    key = str(path)
+    ix = _INDEX_CACHE.get(key)
+    if ix is not None:
+        return ix
+    with _INDEX_LOCK:
+        ix = _INDEX_CACHE.get(key)
+        if ix is None:
+            path.mkdir(parents=True, exist_ok=True)
+            if index.exists_in(key):
+                ix = index.open_dir(key)
+            else:
+                ix = index.create_in(key, _schema)
+            _INDEX_CACHE[key] = ix
+    return ix
 
 
 def index_chunks(collection_id: int, doc_id: int, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
@@ -55,8 +77,7 @@ def index_chunks(collection_id: int, doc_id: int, ids: List[str], texts: List[st
 
 def search(collection_id: int, query: str, n_results: int) -> List[Dict[str, Any]]:
     ix = get_or_create_index(collection_id)
-    qp = QueryParser("text", schema=ix.schema)
-    q = qp.parse(query)
+    q = _PARSER.parse(query)
     with ix.searcher() as searcher:
         results = searcher.search(q, limit=n_results)
         out: List[Dict[str, Any]] = []
@@ -16,3 +16,7 @@ class MemoryConfig:
     long_min_sim: float = 0.78
     promote_min_tokens: int = 40
     promote_on_questions: bool = True
+    # Score long-term memories against their int8 copies instead of the exact
+    # float32 vectors; approximate, so off by default (long_min_sim is tuned
+    # for exact cosine)
+    long_quantized: bool = False
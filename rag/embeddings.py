@@ -1,18 +1,39 @@
 """Embedding backend abstraction with caching."""
 from __future__ import annotations
+from collections import OrderedDict
 import hashlib
 import json
 import sqlite3
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import threading
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 from api.config import settings
 
 
+# Vectors are cached as JSON text; orjson parses/serialises float arrays
+# several times faster than the stdlib when it is installed.
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+else:  # pragma: no cover - exercised only without orjson
+    _loads = json.loads
+    _dumps = json.dumps
+
+
 class EmbeddingClient:
     """Embed text using configurable provider with SQLite caching."""
 
+    # Number of vectors kept in the in-process LRU in front of SQLite.
+    memory_cache_size = 4096
+
     def __init__(self) -> None:
         self.model = settings.embedding_model
         self.provider = settings.embedding_provider.lower()
@@ -31,6 +52,10 @@ class EmbeddingClient:
         cache_path.parent.mkdir(parents=True, exist_ok=True)
         self._conn = sqlite3.connect(str(cache_path), check_same_thread=False)
         self._lock = threading.Lock()
+        # values are tuples: callers get a fresh list, so editing a returned
+        # vector in place cannot corrupt the cache
+        self._memory: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
         with self._lock:
             self._conn.execute(
                 "CREATE TABLE IF NOT EXISTS embedding_cache (key TEXT PRIMARY KEY, vec TEXT)"
@@ -47,26 +72,51 @@ class EmbeddingClient:
         h = hashlib.sha256(data).hexdigest()
         return f"{self.model}:{h}"
 
+    def _remember(self, key: str, vec: List[float]) -> None:
+        # caller holds self._lock
+        self._memory[key] = tuple(vec)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_cache_size:
+            self._memory.popitem(last=False)
+
     def _get_cached(self, key: str) -> Optional[List[float]]:
         with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return list(cached)
             row = self._conn.execute(
                 "SELECT vec FROM embedding_cache WHERE key=?", (key,)
             ).fetchone()
+        vec = None
         if row:
             try:
-                return json.loads(row[0])
+                vec = _loads(row[0])
             except Exception:
-                return None
-        return None
+                vec = None
+        with self._lock:
+            if vec is not None:
+                self._remember(key, vec)
+                self._stats["disk_hits"] += 1
+            else:
+                self._stats["misses"] += 1
+        return vec
 
     def _set_cached(self, key: str, vec: List[float]) -> None:
         with self._lock:
+            self._remember(key, vec)
             self._conn.execute(
                 "INSERT OR REPLACE INTO embedding_cache (key, vec) VALUES (?, ?)",
-                (key, json.dumps(vec)),
+                (key, _dumps(vec)),
             )
 
     # -- public API ------------------------------------------------------
+    def cache_stats(self) -> dict:
+        """Return hit/miss counters for the memory and SQLite cache layers."""
+        with self._lock:
+            return {**self._stats, "memory_size": len(self._memory)}
+
     def embed(self, texts: List[str]) -> List[List[float]]:
         """Embed a list of texts returning a list of vectors."""
         results: List[Optional[List[float]]] = [None] * len(texts)
@@ -116,10 +166,21 @@ class EmbeddingClient:
 
 
 _embedder: Optional[EmbeddingClient] = None
+_embedder_lock = threading.Lock()
 
 
 def get_embedder() -> EmbeddingClient:
     global _embedder
+    # Double-checked so concurrent first requests don't each load a model
+    # (or open a cache connection) and then throw all but one away.
     if _embedder is None:
-        _embedder = EmbeddingClient()
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = EmbeddingClient()
     return _embedder
+
+
+def embedding_cache_stats() -> dict:
+    """Cache counters of the shared embedder, or ``{}`` before it is created."""
+    embedder = _embedder
+    return embedder.cache_stats() if embedder is not None else {}
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from hashlib import blake2b
 from typing import Any, Dict, List, Optional
 
 from rag.embeddings import get_embedder
 from .sql_store import SqlStore
 
-@dataclass
+@dataclass(slots=True)
 class MemoryEntry:
     text: str
     session_id: Optional[str] = None
@@ -26,10 +27,14 @@ class LongTermMemory:
 
     def upsert(self, entries: List[MemoryEntry]) -> None:
         if not entries: return
-        emb = self._embedder()
+        # one batched embed call for all entries instead of one per entry
+        vecs = self._embedder().embed([e.text for e in entries])
         payload: List[Dict[str, Any]] = []
-        for i, e in enumerate(entries):
-            mid = f"mem-{abs(hash((e.text, e.session_id, e.user_id)))%10_000_000}-{i}"
+        for i, (e, vec) in enumerate(zip(entries, vecs)):
+            # built-in hash() is salted per process, so ids would change on
+            # every restart and upserts would never hit existing rows
+            key = "\x1f".join(str(p) for p in (e.text, e.session_id or "", e.user_id or ""))
+            mid = f"mem-{blake2b(key.encode('utf-8', 'ignore'), digest_size=8).hexdigest()}-{i}"
             payload.append({
                 "id": mid,
                 "text": e.text,
@@ -37,7 +42,7 @@ class LongTermMemory:
                 "user_id": e.user_id,
                 "tags": e.tags or [],
                 "importance": float(e.importance),
-                "emb": emb.embed_query(e.text),
+                "emb": vec,
             })
         self.store.upsert_memories(payload)
 
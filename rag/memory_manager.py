@@ -7,7 +7,7 @@ from .sql_store import SqlStore
 from .short_term_memory import ShortTermMemory
 from .long_term_memory import LongTermMemory, MemoryEntry
 
-@dataclass
+@dataclass(slots=True)
 class CacheHit:
     matched_text: str
     answer: str
@@ -16,7 +16,7 @@ class CacheHit:
 class MemoryManager:
     def __init__(self, cfg: Optional[MemoryConfig] = None) -> None:
         self.cfg = cfg or MemoryConfig()
-        self.store = SqlStore(self.cfg.db_path)
+        self.store = SqlStore(self.cfg.db_path, quantized=self.cfg.long_quantized)
         self.short = ShortTermMemory(self.store, max_items=self.cfg.short_max_items)
         self.long  = LongTermMemory(self.store)
 
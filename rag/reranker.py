@@ -6,35 +6,72 @@ from typing import List
 
 from api.config import settings
 
-try:  # pragma: no cover - optional dependency
-    from sentence_transformers import CrossEncoder
-except Exception:  # pragma: no cover
-    CrossEncoder = None  # type: ignore
-
 _reranker = None
+# ``None`` until the optional import has been attempted, then the class or False.
+_cross_encoder_cls = None
+
+
+def _load_cross_encoder():
+    """Import ``CrossEncoder`` on first use.
+
+    ``sentence_transformers`` pulls in torch and transformers, which costs
+    hundreds of milliseconds and a lot of memory; processes that never enable
+    the reranker should not pay for it at import time.
+    """
+    global _cross_encoder_cls
+    if _cross_encoder_cls is None:
+        try:  # pragma: no cover - optional dependency
+            from sentence_transformers import CrossEncoder
+        except Exception:  # pragma: no cover
+            CrossEncoder = False  # type: ignore
+        _cross_encoder_cls = CrossEncoder
+    return _cross_encoder_cls or None
 
 
 def get_reranker():
     """Return a cached CrossEncoder instance if enabled and available."""
     global _reranker
-    if _reranker is None and settings.use_reranker and CrossEncoder is not None:
+    if _reranker is None and settings.use_reranker:
+        CrossEncoder = _load_cross_encoder()
+        if CrossEncoder is None:
+            return None
+        device = _device()
         try:
             _reranker = CrossEncoder(
                 settings.reranker_model,
-                device="cpu",
+                device=device,
             )
+            if device == "cuda":
+                # Cross-encoder scoring is matmul-bound; half precision roughly
+                # doubles throughput on GPU with no visible ranking change.
+                _reranker.model.half()
         except Exception:  # pragma: no cover - dependency issues
             _reranker = None
     return _reranker
 
 
+def _device() -> str:
+    """Return ``"cuda"`` when a GPU is usable, otherwise ``"cpu"``."""
+    try:  # pragma: no cover - torch ships with sentence_transformers
+        import torch
+
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except Exception:  # pragma: no cover
+        return "cpu"
+
+
 def rerank(query: str, texts: List[str]) -> List[float]:
     """Return relevance scores for ``texts`` given ``query`` using the cross-encoder."""
     model = get_reranker()
     if model is None:
         return [0.0] * len(texts)
     pairs = [(query, t) for t in texts]
-    scores = model.predict(pairs)
+    scores = model.predict(
+        pairs,
+        batch_size=64 if str(getattr(model, "device", "cpu")).startswith("cuda") else 32,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+    )
     try:
         return scores.tolist()  # type: ignore[union-attr]
     except Exception:  # pragma: no cover - already a list
@@ -1,16 +1,27 @@
 # rag/retriever.py
 from __future__ import annotations
 
-from typing import List, Dict, Any, Optional
-import math
+from collections import OrderedDict
+import heapq
+from operator import itemgetter
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
 from pathlib import Path
+import threading
 
-import chromadb
+import numpy as np
 
 from api.config import settings
 from rag.embeddings import get_embedder
 from rag.reranker import rerank
 
+if TYPE_CHECKING:
+    # chromadb takes ~0.4s to import; load it on first client instead of
+    # at app startup.
+    import chromadb
+
 
 def get_chroma_client() -> chromadb.PersistentClient:
     """Return a global ChromaDB client using the legacy path.
@@ -18,86 +29,238 @@ def get_chroma_client() -> chromadb.PersistentClient:
     This is retained for health checks but embeddings for document retrieval are
     stored under per-collection directories via :func:`get_collection_client`.
     """
+    import chromadb
+
     return chromadb.PersistentClient(path=settings.chroma_persist_dir)
 
 
+# Chroma clients and "docs" collections keyed by persist path, so a search
+# does not pay for mkdir and client construction on every call.  Keys use
+# the resolved path so a change to ``settings.chroma_persist_dir`` is honoured.
+_CLIENT_CACHE: Dict[str, chromadb.PersistentClient] = {}
+_COLL_CACHE: Dict[str, Tuple[chromadb.PersistentClient, Any]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _collection_path(collection_id: int) -> str:
+    return str(Path(settings.chroma_persist_dir) / f"coll_{collection_id}")
+
+
 def get_collection_client(collection_id: int) -> chromadb.PersistentClient:
     """Return a Chroma client scoped to a specific collection.
 
     Vectors for each collection live under ``data/chroma/coll_<cid>`` so that
     embeddings are isolated on disk.  This ensures RBAC rules can be enforced by
-    only querying the namespaces a user is allowed to access.
+    only querying the namespaces a user is allowed to access.  Clients are
+    created once per directory and reused.
+    """
+    path = _collection_path(collection_id)
+    client = _CLIENT_CACHE.get(path)
+    if client is None:
+        with _CACHE_LOCK:
+            client = _CLIENT_CACHE.get(path)
+            if client is None:
+                import chromadb
+
+                Path(path).mkdir(parents=True, exist_ok=True)
+                client = _CLIENT_CACHE[path] = chromadb.PersistentClient(path=path)
+    return client
+
+
+def _get_docs_collection(collection_id: int):
+    """Return the memoised ``docs`` collection for ``collection_id``.
+
+    The cached handle is tied to the client it came from, so a replaced
+    client (e.g. after the persist dir changes) yields a fresh collection.
+    """
+    client = get_collection_client(collection_id)
+    path = _collection_path(collection_id)
+    cached = _COLL_CACHE.get(path)
+    if cached is not None and cached[0] is client:
+        return cached[1]
+    coll = client.get_or_create_collection(name="docs")
+    with _CACHE_LOCK:
+        _COLL_CACHE[path] = (client, coll)
+    return coll
+
+
+# Final search results keyed by the normalised query, every parameter and
+# setting that shapes the ranking, and the collection set.  Entries expire
+# after ``_RESULT_TTL`` seconds and are dropped as soon as an index they
+# cover changes (see :func:`invalidate_results`).  Each invalidation also
+# bumps a generation counter, per collection or global (key None), so a
+# search that was already running when its collections changed does not
+# store its now stale results.  The cache lives in process memory and an
+# invalidation cannot reach other workers, so it is only used when
+# ``settings.search_result_cache`` is on (single-process deployments).
+_RESULT_CACHE_SIZE = 1024
+_RESULT_TTL = 300.0
+_RESULT_CACHE: "OrderedDict[tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+_RESULT_LOCK = threading.Lock()
+_RESULT_STATS = {"hits": 0, "misses": 0}
+_RESULT_GEN: Dict[Optional[int], int] = {}
+
+
+def _copy_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # callers extend the list and may edit metadata; keep cached copies private
+    return [{**r, "metadata": dict(r["metadata"])} for r in results]
+
+
+def _cached_results(key: tuple) -> Optional[List[Dict[str, Any]]]:
+    now = time.monotonic()
+    with _RESULT_LOCK:
+        entry = _RESULT_CACHE.get(key)
+        if entry is not None and entry[0] > now:
+            _RESULT_CACHE.move_to_end(key)
+            _RESULT_STATS["hits"] += 1
+            return _copy_results(entry[1])
+        if entry is not None:
+            del _RESULT_CACHE[key]
+        _RESULT_STATS["misses"] += 1
+    return None
+
+
+def _result_generation(collection_ids: Iterable[int]) -> tuple:
+    with _RESULT_LOCK:
+        return _generation_locked(collection_ids)
+
+
+def _generation_locked(collection_ids: Iterable[int]) -> tuple:
+    # caller holds _RESULT_LOCK
+    return (_RESULT_GEN.get(None, 0), *(_RESULT_GEN.get(cid, 0) for cid in collection_ids))
+
+
+def _store_results(key: tuple, results: List[Dict[str, Any]], generation: tuple) -> None:
+    with _RESULT_LOCK:
+        # an index changed while this search ran: its results may be stale
+        if _generation_locked(key[-1]) != generation:
+            return
+        _RESULT_CACHE[key] = (time.monotonic() + _RESULT_TTL, _copy_results(results))
+        _RESULT_CACHE.move_to_end(key)
+        if len(_RESULT_CACHE) > _RESULT_CACHE_SIZE:
+            _RESULT_CACHE.popitem(last=False)
+
+
+def invalidate_results(collection_id: Optional[int] = None) -> None:
+    """Forget cached search results that include ``collection_id`` (all if None).
+
+    Call after anything that changes what a collection's indexes return:
+    ingesting, re-indexing, unlinking or purging documents, or metadata edits.
+    """
+    with _RESULT_LOCK:
+        _RESULT_GEN[collection_id] = _RESULT_GEN.get(collection_id, 0) + 1
+        if collection_id is None:
+            _RESULT_CACHE.clear()
+            return
+        for key in [key for key in _RESULT_CACHE if collection_id in key[-1]]:
+            del _RESULT_CACHE[key]
+
+
+def result_cache_stats() -> Dict[str, int]:
+    """Return hit/miss counters and the current size of the result cache."""
+    with _RESULT_LOCK:
+        return {**_RESULT_STATS, "size": len(_RESULT_CACHE)}
+
+
+# Matches any run of two whitespace characters or a whitespace character other
+# than a plain space, i.e. anything ``" ".join(text.split())`` would change.
+_MESSY_WS = re.compile(r"\s\s|[^\S ]")
+
+_T = TypeVar("_T")
+_A = TypeVar("_A")
+
+# Upper bound on concurrent lookups across all in-flight searches.
+_MAX_FANOUT_WORKERS = 8
+_FANOUT_POOL: Optional[ThreadPoolExecutor] = None
+
+
+def _fanout_pool() -> ThreadPoolExecutor:
+    """Process-wide worker pool, created on first use and reused afterwards."""
+    global _FANOUT_POOL
+    if _FANOUT_POOL is None:
+        with _CACHE_LOCK:
+            if _FANOUT_POOL is None:
+                _FANOUT_POOL = ThreadPoolExecutor(
+                    max_workers=_MAX_FANOUT_WORKERS, thread_name_prefix="retriever"
+                )
+    return _FANOUT_POOL
+
+
+def _fan_out(fn: Callable[[_A], _T], items: List[_A]) -> List[_T]:
+    """Run ``fn`` for every item concurrently, preserving input order.
+
+    Chroma and Whoosh spend most of a lookup outside the interpreter (native
+    index traversal and file I/O), so threads overlap the per-collection
+    latency instead of paying it serially.  ``fn`` must not call ``_fan_out``
+    itself: the pool is shared, and nested waits could exhaust it.
     """
-    base = Path(settings.chroma_persist_dir) / f"coll_{collection_id}"
-    base.mkdir(parents=True, exist_ok=True)
-    return chromadb.PersistentClient(path=str(base))
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    return list(_fanout_pool().map(fn, items))
+
 
+_RRF_K = 60
+# Reciprocal-rank weights for the default constant, indexed by 0-based rank.
+_RRF_W: List[float] = (1.0 / (_RRF_K + np.arange(256) + 1)).tolist()
 
-def _cosine(a: List[float], b: List[float]) -> float:
-    """Cosine similarity between two equal-length vectors."""
-    num = sum(x * y for x, y in zip(a, b))
-    da = math.sqrt(sum(x * x for x in a))
-    db = math.sqrt(sum(y * y for y in b))
-    return num / (da * db + 1e-12)
 
+def _rrf_weight(rank: int, k: int = _RRF_K) -> float:
+    """Reciprocal-rank weight of a 0-based ``rank``."""
+    if k == _RRF_K and rank < len(_RRF_W):
+        return _RRF_W[rank]
+    return 1.0 / (k + rank + 1)
 
-def _rrf(rank_lists: List[List[str]], k: int = 60) -> Dict[str, float]:
-    """Compute Reciprocal Rank Fusion scores for given ranking lists."""
-    scores: Dict[str, float] = {}
-    for lst in rank_lists:
-        for rank, id_ in enumerate(lst):
-            scores[id_] = scores.get(id_, 0.0) + 1.0 / (k + rank + 1)
-    return scores
+
+def _normalize_rows(vecs: Any) -> np.ndarray:
+    """Return ``vecs`` as a float32 matrix of unit-length rows."""
+    M = np.asarray(vecs, dtype=np.float32)
+    return M / (np.linalg.norm(M, axis=1, keepdims=True) + 1e-12)
 
 
 def _mmr(
-    query_vec: List[float],
-    cand_vecs: List[List[float]],
-    cand_scores: List[float],
+    query_vec: Any,
+    cand_vecs: Any,
+    cand_scores: Any,
     k: int,
     lambda_mult: float = 0.5,
+    normalized: bool = False,
 ) -> List[int]:
     """
     Greedy Maximal Marginal Relevance (MMR) selection.
-    Returns indices of selected candidates.
+    Returns indices of selected candidates.  ``cand_vecs`` may be a float32
+    matrix or any nested sequence; pass ``normalized=True`` when it already
+    has unit-length rows to skip re-normalising them.
     """
-    # Normalize input to plain Python lists to avoid numpy truthiness issues
-    def _tolist(v):
-        try:
-            # numpy arrays or similar
-            return v.tolist()  # type: ignore[attr-defined]
-        except Exception:
-            return list(v)
-
-    cand_vecs = [_tolist(v) for v in cand_vecs]
     n = len(cand_vecs)
     if k <= 0 or n == 0:
         return []
 
-    k = min(k, n)
-    selected: List[int] = []
-    remaining = list(range(n))
+    if k >= n:
+        return sorted(range(n), key=lambda i: cand_scores[i], reverse=True)
+
+    # Cosine similarity reduces to a dot product on unit rows.  Only the
+    # similarities to each newly picked row are ever needed, so one GEMV per
+    # pick (O(k·n·d)) replaces the full n×n matrix (O(n²·d)).
+    Cn = np.asarray(cand_vecs, dtype=np.float32) if normalized else _normalize_rows(cand_vecs)
+
+    rel = np.asarray(cand_scores, dtype=np.float32)
+    # Running max similarity of every candidate to the selected set.  Starts at
+    # zero so that negative similarities never count as diversity.
+    max_sim = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
 
     # Start with the best candidate by score (higher is better)
-    first = max(remaining, key=lambda i: cand_scores[i])
-    selected.append(first)
-    remaining.remove(first)
-
-    while len(selected) < k and remaining:
-        best_i = None
-        best_val = float("-inf")
-        for i in remaining:
-            rel = cand_scores[i]
-            # diversity = max cosine similarity to already selected items
-            div = 0.0
-            for j in selected:
-                div = max(div, _cosine(cand_vecs[i], cand_vecs[j]))
-            val = lambda_mult * rel - (1.0 - lambda_mult) * div
-            if val > best_val:
-                best_val = val
-                best_i = i
-        selected.append(best_i)  # type: ignore[arg-type]
-        remaining.remove(best_i)  # type: ignore[arg-type]
+    last = int(rel.argmax())
+    selected: List[int] = [last]
+    available[last] = False
+
+    while len(selected) < k:
+        np.maximum(max_sim, Cn @ Cn[last], out=max_sim)
+        val = lambda_mult * rel - (1.0 - lambda_mult) * max_sim
+        val[~available] = -np.inf
+        last = int(val.argmax())
+        selected.append(last)
+        available[last] = False
     return selected
 
 class Retriever:
@@ -106,9 +269,64 @@ class Retriever:
     def __init__(self) -> None:
         self._embedder = get_embedder()
 
-    def _embed_query(self, text: str) -> List[float]:
-        text = " ".join(text.split())
-        return self._embedder.embed_query(text)
+    def _embed_query(self, text: str) -> np.ndarray:
+        # Most queries are already single-spaced; only rebuild the string
+        # when it contains a whitespace run or non-space whitespace.
+        if _MESSY_WS.search(text):
+            text = " ".join(text.split())
+        else:
+            text = text.strip()
+        return np.asarray(self._embedder.embed_query(text), dtype=np.float32)
+
+    def _candidate_embeddings(
+        self,
+        ids: List[str],
+        texts: List[str],
+        metas: List[Dict[str, Any]],
+        target_dim: int,
+    ) -> np.ndarray:
+        """Return unit-normalised vectors for ``ids``, re-embedding any missing.
+
+        Vectors are looked up in each candidate's collection.  Hits that only
+        came from BM25, or whose stored vector does not match the query
+        dimension, are embedded afresh in a single batch.
+        """
+        if not ids:
+            return np.zeros((0, target_dim), dtype=np.float32)
+        by_cid: Dict[int, List[str]] = {}
+        for id_, meta in zip(ids, metas):
+            by_cid.setdefault(meta.get("collection_id"), []).append(id_)
+
+        def _fetch(cid: int) -> Dict[str, Any]:
+            try:
+                coll = _get_docs_collection(cid)
+                res = coll.get(ids=by_cid[cid], include=["embeddings"])
+            except Exception:
+                return {}
+            got_ids = res.get("ids") or []
+            embs = res.get("embeddings")
+            if embs is None:
+                return {}
+            return dict(zip(got_ids, embs))
+
+        stored: Dict[str, Any] = {}
+        for found in _fan_out(_fetch, list(by_cid)):
+            stored.update(found)
+
+        # Fill a single float32 matrix in place rather than building nested
+        # Python lists that get converted again further down.
+        M = np.empty((len(ids), target_dim), dtype=np.float32)
+        missing: List[int] = []
+        for pos, id_ in enumerate(ids):
+            e = stored.get(id_)
+            if e is None or len(e) != target_dim:
+                missing.append(pos)
+            else:
+                M[pos] = e
+        if missing:
+            new_embs = self._embedder.embed([texts[pos] for pos in missing])
+            M[missing] = np.asarray(new_embs, dtype=np.float32)
+        return _normalize_rows(M)
 
     def search(
         self,
@@ -120,139 +338,147 @@ class Retriever:
     ) -> List[Dict[str, Any]]:
         """Retrieve top-k chunks for ``query`` with optional BM25, fusion and reranking."""
 
-        if k <= 0:
+        if k <= 0 or not allowed_collections:
             return []
 
+        cache_key = (
+            " ".join(query.split()),
+            k,
+            lambda_mult,
+            fetch_multiplier,
+            settings.chroma_persist_dir,
+            settings.use_bm25,
+            settings.use_reranker,
+            settings.rrf_vector_weight,
+            settings.rrf_bm25_weight,
+            tuple(sorted(set(allowed_collections))),
+        )
+        use_cache = settings.search_result_cache
+        if use_cache:
+            cached = _cached_results(cache_key)
+            if cached is not None:
+                return cached
+            generation = _result_generation(cache_key[-1])
+
         qvec = self._embed_query(query)
         n_results = max(k * max(1, fetch_multiplier), k)
 
-        if not allowed_collections:
-            return []
-
         # ---- Vector search ----
-        vec_hits: List[Dict[str, Any]] = []
-        for cid in allowed_collections:
-            client = get_collection_client(cid)
-            coll = client.get_or_create_collection(name="docs")
+        def _vector_search(cid: int) -> List[Dict[str, Any]]:
+            coll = _get_docs_collection(cid)
             res = coll.query(
                 query_embeddings=[qvec],
                 n_results=n_results,
-                include=["documents", "metadatas", "embeddings", "distances"],
+                include=["documents", "metadatas", "distances"],
             )
             docs = (res.get("documents") or [[]])[0]
+            ids = (res.get("ids") or [[]])[0] or [""] * len(docs)
             metas = (res.get("metadatas") or [[]])[0]
-            embs = (res.get("embeddings") or [[]])[0]
             dists = (res.get("distances") or [[]])[0]
-            for doc, meta, emb, dist in zip(docs, metas, embs, dists):
+            hits: List[Dict[str, Any]] = []
+            for vid, doc, meta, dist in zip(ids, docs, metas, dists):
                 meta = {**meta, "collection_id": cid}
-                vec_hits.append(
+                hits.append(
                     {
-                        "id": meta.get("chunk_id", ""),
+                        # the Chroma id is stable and unique, unlike an empty
+                        # fallback that would merge every id-less hit in fusion
+                        "id": meta.get("chunk_id") or vid,
                         "text": doc,
                         "meta": meta,
-                        "embedding": emb,
                         "vec_score": 1.0 - dist if dist is not None else 0.0,
                     }
                 )
+            return hits
 
-        vec_hits.sort(key=lambda h: h["vec_score"], reverse=True)
-        vec_hits = vec_hits[:n_results]
+        jobs: List[Tuple[Callable[[int], List[Dict[str, Any]]], int]] = [
+            (_vector_search, cid) for cid in allowed_collections
+        ]
 
         # ---- BM25 search ----
-        bm25_hits: List[Dict[str, Any]] = []
         if settings.use_bm25:
             from rag import bm25
 
-            for cid in allowed_collections:
-                results = bm25.search(cid, query, n_results)
-                for hit in results:
-                    meta = {**hit["metadata"], "collection_id": cid}
-                    bm25_hits.append(
-                        {
-                            "id": hit["id"],
-                            "text": hit["text"],
-                            "meta": meta,
-                            "bm25_score": hit["score"],
-                        }
-                    )
-            bm25_hits.sort(key=lambda h: h["bm25_score"], reverse=True)
-            bm25_hits = bm25_hits[:n_results]
+            def _bm25_search(cid: int) -> List[Dict[str, Any]]:
+                return [
+                    {
+                        "id": hit["id"],
+                        "text": hit["text"],
+                        "meta": {**hit["metadata"], "collection_id": cid},
+                        "bm25_score": hit["score"],
+                    }
+                    for hit in bm25.search(cid, query, n_results)
+                ]
+
+            jobs += [(_bm25_search, cid) for cid in allowed_collections]
+
+        # Vector and BM25 lookups for every collection go out as one batch so
+        # the two retrievers overlap instead of running back to back.
+        found = _fan_out(lambda job: job[0](job[1]), jobs)
+        n_coll = len(allowed_collections)
+        vec_hits = heapq.nlargest(
+            n_results,
+            (hit for hits in found[:n_coll] for hit in hits),
+            key=itemgetter("vec_score"),
+        )
+        bm25_hits: List[Dict[str, Any]] = heapq.nlargest(
+            n_results,
+            (hit for hits in found[n_coll:] for hit in hits),
+            key=itemgetter("bm25_score"),
+        )
 
         # ---- Fuse with RRF ----
-        if bm25_hits:
-            rank_lists = [
-                [h["id"] for h in vec_hits],
-                [h["id"] for h in bm25_hits],
-            ]
-            rrf_scores = _rrf(rank_lists)
-            combined: Dict[str, Dict[str, Any]] = {}
-            for h in vec_hits:
-                combined[h["id"]] = {
-                    "text": h["text"],
-                    "meta": h["meta"],
-                    "embedding": h["embedding"],
-                    "score": rrf_scores[h["id"]],
-                }
-            for h in bm25_hits:
-                if h["id"] in combined:
-                    combined[h["id"]]["score"] = rrf_scores[h["id"]]
-                else:
-                    combined[h["id"]] = {
-                        "text": h["text"],
-                        "meta": h["meta"],
-                        "embedding": None,
-                        "score": rrf_scores[h["id"]],
-                    }
-            fused_ids = sorted(combined, key=lambda x: combined[x]["score"], reverse=True)
-        else:
-            combined = {
-                h["id"]: {
-                    "text": h["text"],
-                    "meta": h["meta"],
-                    "embedding": h["embedding"],
-                    "score": h["vec_score"],
-                }
-                for h in vec_hits
-            }
-            fused_ids = [h["id"] for h in vec_hits]
-
-        fused_ids = fused_ids[:n_results]
-
-        # Ensure embeddings are present and match query vector length
-        target_dim = len(qvec)
-        missing_ids = [
-            i
-            for i in fused_ids
-            if combined[i]["embedding"] is None
-            or len(combined[i]["embedding"]) != target_dim
-        ]
-        if missing_ids:
-            texts_to_embed = [combined[i]["text"] for i in missing_ids]
-            new_embs = self._embedder.embed(texts_to_embed)
-            for i, emb in zip(missing_ids, new_embs):
-                combined[i]["embedding"] = emb
-
-        cand_docs = [combined[i]["text"] for i in fused_ids]
-        cand_metas = [combined[i]["meta"] for i in fused_ids]
-        cand_embs = [combined[i]["embedding"] for i in fused_ids]
-        cand_scores = [combined[i]["score"] for i in fused_ids]
-
-        if settings.use_reranker:
+        # Candidates are kept as parallel lists (one slot per unique id) so
+        # fusion touches a flat score array instead of a dict per hit.
+        id_to_pos: Dict[str, int] = {}
+        ids: List[str] = []
+        texts: List[str] = []
+        metas: List[Dict[str, Any]] = []
+        scores: List[float] = []
+        fuse = bool(bm25_hits)
+        ranked = (
+            ((vec_hits, settings.rrf_vector_weight), (bm25_hits, settings.rrf_bm25_weight))
+            if fuse
+            else ((vec_hits, 1.0),)
+        )
+        for hits, weight in ranked:
+            for rank, h in enumerate(hits):
+                score = weight * _rrf_weight(rank) if fuse else h["vec_score"]
+                pos = id_to_pos.get(h["id"])
+                if pos is None:
+                    id_to_pos[h["id"]] = len(ids)
+                    ids.append(h["id"])
+                    texts.append(h["text"])
+                    metas.append(h["meta"])
+                    scores.append(score)
+                elif fuse:
+                    scores[pos] += score
+
+        order = np.argsort(-np.asarray(scores), kind="stable")[:n_results].tolist()
+        fused_ids = [ids[p] for p in order]
+        cand_docs = [texts[p] for p in order]
+        cand_metas = [metas[p] for p in order]
+        cand_scores = [scores[p] for p in order]
+
+        # With no more candidates than slots, a cross-encoder pass cannot
+        # change which chunks are returned, so keep the fusion scores.  The
+        # returned "score" is therefore a cross-encoder logit only when the
+        # reranker ran, and a fusion (or vector) score otherwise; like the
+        # BM25 toggle, it only orders hits within one search and is not
+        # comparable across searches.
+        if settings.use_reranker and len(cand_docs) > k:
             cand_scores = rerank(query, cand_docs)
 
-        have_embs = all(e is not None for e in cand_embs)
-        if not have_embs:
-            idx = list(range(len(cand_docs)))
-            idx.sort(key=lambda i: cand_scores[i], reverse=True)
-            keep = idx[:k]
+        # MMR only reorders when it has to drop candidates; when all of them
+        # are kept, plain score order avoids the embedding fetch entirely.
+        if lambda_mult is None or len(cand_docs) <= k:
+            keep = heapq.nlargest(k, range(len(cand_docs)), key=cand_scores.__getitem__)
         else:
-            emb_list = [list(e) for e in cand_embs]
-            if lambda_mult is None:
-                idx = list(range(len(cand_docs)))
-                idx.sort(key=lambda i: cand_scores[i], reverse=True)
-                keep = idx[:k]
-            else:
-                keep = _mmr(qvec, emb_list, cand_scores, k, lambda_mult=lambda_mult)
+            # Vectors are only needed for MMR, so they are fetched for the
+            # final candidates rather than shipped with every query result.
+            cand_embs = self._candidate_embeddings(fused_ids, cand_docs, cand_metas, len(qvec))
+            keep = _mmr(
+                qvec, cand_embs, cand_scores, k, lambda_mult=lambda_mult, normalized=True
+            )
 
         out: List[Dict[str, Any]] = []
         for i in keep:
@@ -263,4 +489,6 @@ class Retriever:
                     "score": cand_scores[i],
                 }
             )
+        if use_cache:
+            _store_results(cache_key, out, generation)
         return out
@@ -1,54 +1,121 @@
 from __future__ import annotations
 
-import json, sqlite3, math, time
+import json, sqlite3, time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
+
 # --- helpers -------------------------------------------------
-def _vec_to_json(vec: Optional[Iterable[float]]) -> str:
-    return json.dumps(list(vec or []), ensure_ascii=False)
+# Vectors are stored as raw float32 BLOBs: decoding is a memcpy instead of a
+# JSON parse plus a float() per element, and rows are roughly half the size.
+_EMPTY_VEC = np.zeros(0, dtype=np.float32)
+
+def _vec_to_blob(vec: Optional[Iterable[float]]) -> bytes:
+    if vec is None: return b""
+    return np.asarray(vec, dtype="<f4").tobytes()
 
-def _json_to_vec(s: Optional[str]) -> List[float]:
-    if not s: return []
-    try: return [float(x) for x in json.loads(s)]
-    except Exception: return []
+def _blob_to_vec(b: Optional[bytes | str]) -> np.ndarray:
+    if not b: return _EMPTY_VEC
+    if isinstance(b, str):  # legacy JSON text row
+        try: return np.asarray(json.loads(b), dtype=np.float32)
+        except Exception: return _EMPTY_VEC
+    return np.frombuffer(b, dtype="<f4")
 
-def _cos(u: List[float], v: List[float]) -> float:
-    if not u or not v: return 0.0
-    s = sum(a*b for a,b in zip(u,v))
-    nu = math.sqrt(sum(a*a for a in u)); nv = math.sqrt(sum(b*b for b in v))
-    if nu == 0 or nv == 0: return 0.0
-    return s/(nu*nv)
+def _quantize(vec: Iterable[float]) -> Tuple[bytes, float]:
+    """Unit-normalize ``vec`` and quantize it to int8 with a per-vector scale."""
+    v = np.asarray(vec if vec is not None else [], dtype=np.float32)
+    n = float(np.linalg.norm(v)) if v.size else 0.0
+    if n == 0.0: return b"", 0.0
+    u = v / n
+    scale = float(np.abs(u).max()) / 127.0
+    return np.round(u / scale).astype(np.int8).tobytes(), scale
+
+def _cos_scores(q_vec: Iterable[float], vecs: List[np.ndarray]) -> np.ndarray:
+    """Cosine similarity of ``q_vec`` against every vector in ``vecs``.
+
+    Stacks the vectors into one float32 matrix and scores them with a single
+    matrix-vector product.  Empty, zero or dimension-mismatched vectors score 0.
+    """
+    scores = np.zeros(len(vecs), dtype=np.float32)
+    q = np.asarray(q_vec if q_vec is not None else [], dtype=np.float32)
+    qn = float(np.linalg.norm(q)) if q.size else 0.0
+    if qn == 0.0: return scores
+    rows = [i for i, v in enumerate(vecs) if len(v) == q.size]
+    if not rows: return scores
+    M = np.stack([np.asarray(vecs[i], dtype=np.float32) for i in rows])
+    norms = np.linalg.norm(M, axis=1) * qn
+    # zero-norm rows have a zero dot product, so they stay at 0
+    scores[rows] = (M @ q) / np.maximum(norms, 1e-12)
+    return scores
+
+def _topk(scores: np.ndarray, k: int) -> List[int]:
+    """Indices of the ``k`` highest scores, best first (ties keep input order)."""
+    n = len(scores)
+    if k <= 0 or n == 0: return []
+    idx = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+    return idx[np.lexsort((idx, -scores[idx]))].tolist()
 
 # --- store ---------------------------------------------------
 class SqlStore:
     """
     Single-file SQLite store for short- and long-term memory.
     Tables:
-      interactions(session_id TEXT, ts REAL, user_input TEXT, answer TEXT, q_vec TEXT)
-      memories(id TEXT PRIMARY KEY, text TEXT, session_id TEXT, user_id TEXT, tags TEXT, importance REAL, emb TEXT)
+      interactions(session_id TEXT, ts REAL, user_input TEXT, answer TEXT, q_vec BLOB)
+      memories(id TEXT PRIMARY KEY, text TEXT, session_id TEXT, user_id TEXT, tags TEXT, importance REAL, emb BLOB,
+               emb_q BLOB, emb_scale REAL)
+    Vectors are little-endian float32 BLOBs; rows written as JSON text by older
+    versions are converted on open.
+    Memories also keep an int8 copy of the unit-normalized vector (emb_q with
+    per-row scale emb_scale), a quarter of the float32 bytes to read.
+    Long-term search decodes the memories into one float32 matrix per
+    memories_version and scores each query with a single matrix-vector
+    product: the exact vectors by default, or the dequantized int8 copies with
+    ``quantized=True``.
     """
-    def __init__(self, db_path: Path) -> None:
+    def __init__(self, db_path: Path, quantized: bool = False) -> None:
         db_path.parent.mkdir(parents=True, exist_ok=True)
         self.db_path = str(db_path)
+        self.quantized = bool(quantized)
+        # decoded memory matrix, reused until the memories table changes
+        # (swapped wholesale, so readers never see a half-built entry)
+        self._mem_cache: Optional[Tuple[int, List[tuple], Dict[int, Tuple[np.ndarray, np.ndarray]]]] = None
         self._init()
 
     def _conn(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)  # autocommit
+        con = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)  # autocommit
+        # WAL (set once in _init) keeps commits crash-safe at NORMAL sync.
+        # Unlike journal_mode, synchronous is not stored in the database file:
+        # it resets to FULL on every connection, so it is set on each open.
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
 
     def _init(self) -> None:
         with self._conn() as con:
+            con.execute("PRAGMA journal_mode=WAL")
             con.execute("""
                 CREATE TABLE IF NOT EXISTS interactions(
                     session_id TEXT,
                     ts REAL,
                     user_input TEXT,
                     answer TEXT,
-                    q_vec TEXT
+                    q_vec BLOB
                 )
             """)
             con.execute("CREATE INDEX IF NOT EXISTS idx_inter_s ON interactions(session_id, ts)")
+            # keep only the newest 30 interactions per session; the 30th-newest
+            # ts is an index seek, so trimming no longer builds a NOT IN set
+            con.execute("""
+                CREATE TRIGGER IF NOT EXISTS trim_interactions AFTER INSERT ON interactions
+                BEGIN
+                    DELETE FROM interactions
+                    WHERE session_id = NEW.session_id AND ts < (
+                        SELECT ts FROM interactions WHERE session_id = NEW.session_id
+                        ORDER BY ts DESC LIMIT 1 OFFSET 29
+                    );
+                END
+            """)
             con.execute("""
                 CREATE TABLE IF NOT EXISTS memories(
                     id TEXT PRIMARY KEY,
@@ -57,26 +124,62 @@ class SqlStore:
                     user_id TEXT,
                     tags TEXT,
                     importance REAL,
-                    emb TEXT
+                    emb BLOB,
+                    emb_q BLOB,
+                    emb_scale REAL
                 )
             """)
+            # memories_version moves on every write so readers can tell when
+            # an in-process copy of the table is stale
+            con.execute("CREATE TABLE IF NOT EXISTS store_meta(key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            con.execute("INSERT OR IGNORE INTO store_meta(key, value) VALUES('memories_version', 0)")
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                con.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS memories_version_{event.lower()} AFTER {event} ON memories
+                    BEGIN
+                        UPDATE store_meta SET value = value + 1 WHERE key = 'memories_version';
+                    END
+                """)
+            self._migrate_json_vectors(con)
+            self._migrate_quantized(con)
+
+    @staticmethod
+    def _migrate_json_vectors(con: sqlite3.Connection) -> None:
+        # one-shot rewrite of JSON-encoded vectors from older databases
+        for table, key, col in (("interactions", "rowid", "q_vec"), ("memories", "id", "emb")):
+            rows = con.execute(
+                f"SELECT {key}, {col} FROM {table} WHERE typeof({col})='text'"
+            ).fetchall()
+            if rows:
+                con.executemany(
+                    f"UPDATE {table} SET {col}=? WHERE {key}=?",
+                    [(_vec_to_blob(_blob_to_vec(v)), k) for k, v in rows],
+                )
+
+    @staticmethod
+    def _migrate_quantized(con: sqlite3.Connection) -> None:
+        # add and backfill the int8 copy for databases created before it existed
+        cols = {r[1] for r in con.execute("PRAGMA table_info(memories)")}
+        if "emb_q" not in cols: con.execute("ALTER TABLE memories ADD COLUMN emb_q BLOB")
+        if "emb_scale" not in cols: con.execute("ALTER TABLE memories ADD COLUMN emb_scale REAL")
+        rows = con.execute("SELECT id, emb FROM memories WHERE emb_q IS NULL").fetchall()
+        if rows:
+            con.executemany(
+                "UPDATE memories SET emb_q=?, emb_scale=? WHERE id=?",
+                [(*_quantize(_blob_to_vec(em)), i) for i, em in rows],
+            )
 
     # -------- short-term ------------
     def add_interaction(self, session_id: str, user_input: str, answer: str, q_vec: List[float]) -> None:
+        # retention (last 30 per session) is enforced by the trim_interactions trigger
         with self._conn() as con:
             con.execute(
                 "INSERT INTO interactions(session_id, ts, user_input, answer, q_vec) VALUES(?,?,?,?,?)",
-                (session_id, time.time(), user_input, answer, _vec_to_json(q_vec)),
+                (session_id, time.time(), user_input, answer, _vec_to_blob(q_vec)),
             )
-            # keep only last N
-            con.execute("""
-                DELETE FROM interactions
-                WHERE session_id=? AND ts NOT IN (
-                    SELECT ts FROM interactions WHERE session_id=? ORDER BY ts DESC LIMIT ?
-                )
-            """, (session_id, session_id, 30))
 
-    def recent_interactions(self, session_id: str, n: int) -> List[Dict[str, Any]]:
+    def _recent_interactions(self, session_id: str, n: int) -> List[Dict[str, Any]]:
+        # q_vec stays a float32 array here; public readers convert to lists
         with self._conn() as con:
             rows = con.execute(
                 "SELECT ts, user_input, answer, q_vec FROM interactions WHERE session_id=? ORDER BY ts DESC LIMIT ?",
@@ -84,36 +187,54 @@ class SqlStore:
             ).fetchall()
         out = []
         for ts, q, a, v in rows:
-            out.append({"ts": ts, "user_input": q, "answer": a, "q_vec": _json_to_vec(v)})
+            out.append({"ts": ts, "user_input": q, "answer": a, "q_vec": _blob_to_vec(v)})
+        return out
+
+    def recent_interactions(self, session_id: str, n: int) -> List[Dict[str, Any]]:
+        out = self._recent_interactions(session_id, n)
+        for it in out: it["q_vec"] = it["q_vec"].tolist()
         return out
 
     def most_similar_interaction(self, session_id: str, q_vec: List[float]) -> Optional[Tuple[float, Dict[str,Any]]]:
-        # brute force in Python (datasets are small)
-        items = self.recent_interactions(session_id, n=300)
-        scored = [( _cos(q_vec, it.get("q_vec", [])), it) for it in items]
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return scored[0] if scored else None
+        # brute force, but one matmul over the stacked vectors (datasets are small)
+        items = self._recent_interactions(session_id, n=300)
+        if not items: return None
+        scores = _cos_scores(q_vec, [it["q_vec"] for it in items])
+        best = _topk(scores, 1)[0]
+        item = items[best]
+        item["q_vec"] = item["q_vec"].tolist()
+        return float(scores[best]), item
 
     # -------- long-term ------------
     def upsert_memories(self, entries: List[Dict[str, Any]]) -> None:
         if not entries: return
+        rows = [(
+            e["id"], e["text"], e.get("session_id"), e.get("user_id"),
+            json.dumps(e.get("tags", []), ensure_ascii=False),
+            float(e.get("importance", 0.5)), _vec_to_blob(e.get("emb", [])),
+            *_quantize(e.get("emb", [])),
+        ) for e in entries]
+        # one transaction for the batch instead of an autocommit (and fsync) per row
         with self._conn() as con:
-            for e in entries:
-                con.execute("""
-                    INSERT INTO memories(id, text, session_id, user_id, tags, importance, emb)
-                    VALUES(?,?,?,?,?,?,?)
+            con.execute("BEGIN")
+            try:
+                con.executemany("""
+                    INSERT INTO memories(id, text, session_id, user_id, tags, importance, emb, emb_q, emb_scale)
+                    VALUES(?,?,?,?,?,?,?,?,?)
                     ON CONFLICT(id) DO UPDATE SET
                       text=excluded.text,
                       session_id=excluded.session_id,
                       user_id=excluded.user_id,
                       tags=excluded.tags,
                       importance=excluded.importance,
-                      emb=excluded.emb
-                """, (
-                    e["id"], e["text"], e.get("session_id"), e.get("user_id"),
-                    json.dumps(e.get("tags", []), ensure_ascii=False),
-                    float(e.get("importance", 0.5)), _vec_to_json(e.get("emb", []))
-                ))
+                      emb=excluded.emb,
+                      emb_q=excluded.emb_q,
+                      emb_scale=excluded.emb_scale
+                """, rows)
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+            con.execute("COMMIT")
 
     def all_memories(self) -> List[Dict[str, Any]]:
         with self._conn() as con:
@@ -122,11 +243,56 @@ class SqlStore:
         for i,t,s,u,tg,imp,em in rows:
             out.append({"id": i, "text": t, "session_id": s, "user_id": u,
                         "tags": json.loads(tg or "[]"), "importance": float(imp),
-                        "emb": _json_to_vec(em)})
+                        "emb": _blob_to_vec(em).tolist()})
         return out
 
+    def _memory_index(self, dim: int) -> Tuple[List[tuple], Tuple[np.ndarray, np.ndarray]]:
+        """Memory rows plus (row indices, score matrix) for ``dim``-sized vectors.
+
+        The matrix holds unit-normalized float32 vectors, or with
+        ``quantized=True`` the dequantized int8 copies.  The table is read and
+        decoded once per process and again only after memories_version moves,
+        instead of on every search.
+        """
+        with self._conn() as con:
+            version = con.execute("SELECT value FROM store_meta WHERE key='memories_version'").fetchone()[0]
+            cache = self._mem_cache
+            if cache is None or cache[0] != version:
+                # read after the version, so a concurrent write can only make
+                # the rows newer than the tag and force one extra rebuild
+                rows = con.execute(
+                    "SELECT id, text, session_id, user_id, tags, importance, emb, emb_q, emb_scale FROM memories"
+                ).fetchall()
+                cache = self._mem_cache = (version, rows, {})
+        rows, by_dim = cache[1], cache[2]
+        entry = by_dim.get(dim)
+        if entry is None:
+            if self.quantized:
+                sel = np.asarray([j for j, r in enumerate(rows) if r[7] and len(r[7]) == dim], dtype=np.intp)
+                Q = np.frombuffer(b"".join(rows[j][7] for j in sel), dtype=np.int8).reshape(len(sel), dim)
+                scales = np.asarray([rows[j][8] for j in sel], dtype=np.float32)
+                M = Q.astype(np.float32) * scales[:, None]
+            else:
+                vecs = [_blob_to_vec(r[6]) for r in rows]
+                sel = np.asarray([j for j, v in enumerate(vecs) if v.size == dim], dtype=np.intp)
+                M = np.stack([vecs[j] for j in sel]) if len(sel) else np.zeros((0, dim), dtype=np.float32)
+                # zero-norm rows stay zero, so they score 0
+                M = M / np.maximum(np.linalg.norm(M, axis=1, keepdims=True), 1e-12)
+            entry = by_dim[dim] = (sel, M)
+        return rows, entry
+
     def topk_similar_memories(self, q_vec: List[float], k: int) -> List[Tuple[float, Dict[str, Any]]]:
-        items = self.all_memories()
-        scored = [( _cos(q_vec, it.get("emb", [])), it) for it in items]
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return scored[:k]
+        # items carry no "emb", only the fields search needs
+        q = np.asarray(q_vec if q_vec is not None else [], dtype=np.float32)
+        rows, (sel, M) = self._memory_index(q.size)
+        scores = np.zeros(len(rows), dtype=np.float32)
+        qn = float(np.linalg.norm(q)) if q.size else 0.0
+        if qn and len(sel):
+            # rows are (approximately) unit-length, so this is cosine
+            scores[sel] = M @ (q / qn)
+        out = []
+        for j in _topk(scores, int(k)):
+            i, t, s, u, tg, imp = rows[j][:6]
+            out.append((float(scores[j]), {"id": i, "text": t, "session_id": s, "user_id": u,
+                                           "tags": json.loads(tg or "[]"), "importance": float(imp)}))
+        return out
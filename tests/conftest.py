@@ -0,0 +1,235 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Ensure project root in path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# Configure the app before anything under ``api`` is imported: one in-memory
+# database for the whole session and scratch directories outside the repo.
+# Both are private to the process, so ``pytest -n auto`` workers never share
+# a SQLite file (embedding cache included) or an index directory.
+_SCRATCH = Path(tempfile.mkdtemp(prefix="rag-tests-"))
+atexit.register(shutil.rmtree, _SCRATCH, ignore_errors=True)
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("JWT_SECRET", "secret")
+os.environ["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+os.environ["COLLECTIONS_DIR"] = str(_SCRATCH / "collections")
+os.environ["CHROMA_PERSIST_DIR"] = str(_SCRATCH / "chroma")
+os.environ["LOGS_DIR"] = str(_SCRATCH / "logs")
+os.environ["RAW_DOCS_DIR"] = str(_SCRATCH / "raw")
+os.environ["BM25_INDEX_DIR"] = str(_SCRATCH / "bm25")
+os.environ["EMBEDDING_CACHE_DB"] = str(_SCRATCH / "embedding_cache.sqlite3")
+# bcrypt's minimum cost; no test depends on the work factor.
+os.environ["PASSWORD_HASH_ROUNDS"] = "4"
+
+
+@event.listens_for(Engine, "connect")
+def _fast_sqlite(dbapi_conn, _record):
+    # Test databases are throwaway: skip the journal file and fsync on commit.
+    if type(dbapi_conn).__module__.startswith("sqlite3"):
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=MEMORY")
+        cur.execute("PRAGMA synchronous=OFF")
+        cur.execute("PRAGMA temp_store=MEMORY")
+        cur.execute("PRAGMA cache_size=-65536")
+        cur.close()
+
+
+@pytest.fixture(scope="session")
+def _shared_app():
+    from api import main  # type: ignore
+
+    return main.app
+
+
+@pytest.fixture
+def app(_shared_app, tmp_path, monkeypatch):
+    """The session-wide app with empty tables and storage under ``tmp_path``."""
+    from api import audit, models, query_logger, security  # type: ignore
+    from api.config import settings  # type: ignore
+    from api.db import engine  # type: ignore
+    from api.services import email  # type: ignore
+    from rag import retriever  # type: ignore
+
+    with engine.begin() as conn:
+        for table in reversed(models.Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    security.revoked_tokens.clear()
+    email.sent_emails.clear()
+    # Collection ids restart once the tables are empty; drop cached hits.
+    retriever.invalidate_results()
+
+    logs_dir = tmp_path / "logs"
+    logs_dir.mkdir()
+    monkeypatch.setattr(settings, "collections_dir", str(tmp_path / "collections"))
+    monkeypatch.setattr(settings, "chroma_persist_dir", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "bm25_index_dir", str(tmp_path / "bm25"))
+    monkeypatch.setattr(query_logger, "LOG_FILE", logs_dir / "queries.log")
+    monkeypatch.setattr(audit, "LOG_FILE", logs_dir / "audit.log")
+
+    # Middleware instances (rate limiter history) are rebuilt on next request.
+    _shared_app.middleware_stack = None
+    yield _shared_app
+    _shared_app.dependency_overrides.clear()
+
+
+# Password shared by every fixture user; bcrypt runs once per session for it.
+TEST_PASSWORD = "TestPass123!"
+
+
+@pytest.fixture(scope="session")
+def _password_hash():
+    from api.security import get_password_hash  # type: ignore
+
+    return get_password_hash(TEST_PASSWORD)
+
+
+@pytest.fixture
+def db_session(app):
+    """A SQLAlchemy session on the test database, closed on teardown."""
+    from api.db import SessionLocal  # type: ignore
+
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _add_user(db, email, name, role, password_hash):
+    from api import models  # type: ignore
+
+    user = models.User(email=email, name=name, password_hash=password_hash, role=role)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def admin(db_session, _password_hash):
+    return _add_user(db_session, "admin@test.com", "Admin", "admin", _password_hash)
+
+
+@pytest.fixture
+def user(db_session, _password_hash):
+    return _add_user(db_session, "user@test.com", "User", "user", _password_hash)
+
+
+@pytest.fixture
+def superadmin(db_session, _password_hash):
+    return _add_user(db_session, "super@test.com", "Super", "superadmin", _password_hash)
+
+
+@pytest.fixture
+def chat_session(db_session, user):
+    """Id of an empty chat session owned by ``user``."""
+    from api import models  # type: ignore
+
+    session = models.ChatSession(user_id=user.id, session_title="New Chat")
+    db_session.add(session)
+    db_session.commit()
+    return session.id
+
+
+@pytest.fixture
+def admin_token(admin):
+    from api.services import auth as auth_service  # type: ignore
+
+    return auth_service.issue_access_token(admin)
+
+
+@pytest.fixture
+def user_token(user):
+    from api.services import auth as auth_service  # type: ignore
+
+    return auth_service.issue_access_token(user)
+
+
+@pytest.fixture
+def superadmin_token(superadmin):
+    from api.services import auth as auth_service  # type: ignore
+
+    return auth_service.issue_access_token(superadmin)
+
+
+@pytest.fixture
+def admin_headers(admin_token):
+    return {"Authorization": f"Bearer {admin_token}"}
+
+
+@pytest.fixture
+def user_headers(user_token):
+    return {"Authorization": f"Bearer {user_token}"}
+
+
+@pytest.fixture
+def superadmin_headers(superadmin_token):
+    return {"Authorization": f"Bearer {superadmin_token}"}
+
+
+@pytest.fixture(scope="session")
+def blank_pdf_bytes():
+    """A one-page blank PDF, built once per session."""
+    import io
+
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def ephemeral_chroma(monkeypatch):
+    """Keep this test's Chroma collections in memory instead of on disk.
+
+    Each collection id gets its own in-memory database, named uniquely per
+    test so ids reused after the tables are emptied start out empty.
+    """
+    import uuid
+
+    import chromadb
+    from rag import retriever  # type: ignore
+
+    admin = chromadb.AdminClient(chromadb.Settings(is_persistent=False))
+    prefix = uuid.uuid4().hex
+    clients = {}
+
+    def get_collection_client(collection_id):
+        client = clients.get(collection_id)
+        if client is None:
+            name = f"{prefix}_{collection_id}"
+            admin.create_database(name)
+            client = clients[collection_id] = chromadb.EphemeralClient(database=name)
+        return client
+
+    monkeypatch.setattr(retriever, "get_collection_client", get_collection_client)
+
+
+@pytest.fixture(scope="session")
+def _shared_client(_shared_app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(_shared_app) as c:
+        yield c
+
+
+@pytest.fixture
+def client(app, _shared_client):
+    """The session-wide TestClient, bound to a freshly reset ``app``."""
+    _shared_client.cookies.clear()
+    return _shared_client
@@ -1,18 +1,6 @@
-import os
-import sys
 import types
 
-# Add project root to path for importing rag package
-current_dir = os.path.dirname(__file__)
-project_root = os.path.abspath(os.path.join(current_dir, ".."))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
-
-# Minimal env for settings import
-os.environ.setdefault("OPENAI_API_KEY", "test")
-os.environ.setdefault("JWT_SECRET", "secret")
-
-from rag import answerer  # type: ignore  # noqa: E402
+from rag import answerer  # type: ignore
 
 
 class FakeResp:
@@ -1,78 +1,21 @@
-import os
-import sys
-from fastapi.testclient import TestClient
+import pytest
 
-# Ensure project root in path
-current_dir = os.path.dirname(__file__)
-project_root = os.path.abspath(os.path.join(current_dir, ".."))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
 
+@pytest.fixture
+def two_collections(db_session, admin):
+    """Two empty collections owned by ``admin``, inserted in one commit."""
+    from api import models  # type: ignore
 
-def create_app(tmp_path):
-    os.environ.setdefault("OPENAI_API_KEY", "test")
-    os.environ.setdefault("JWT_SECRET", "secret")
-    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path/'app.db'}"
-    os.environ["COLLECTIONS_DIR"] = str(tmp_path / "collections")
-    os.environ["CHROMA_PERSIST_DIR"] = str(tmp_path / "chroma")
-    os.environ["LOGS_DIR"] = str(tmp_path / "logs")
-    import importlib
-    import api.config as config  # type: ignore
-    import api.db as db  # type: ignore
-    import rag.retriever as retriever  # type: ignore
-    import api.services.docs as docs  # type: ignore
-    import api.query_logger as qlog  # type: ignore
+    colls = [models.Collection(name=name, description="", owner_id=admin.id) for name in ("C1", "C2")]
+    db_session.add_all(colls)
+    db_session.commit()
+    return [c.id for c in colls]
 
-    importlib.reload(config)
-    importlib.reload(db)
-    importlib.reload(retriever)
-    importlib.reload(docs)
-    importlib.reload(qlog)
 
-    main = importlib.import_module("api.main")  # type: ignore
-    importlib.reload(main)
-    app = main.create_app()
-    return app
-
-
-def create_admin(db):
-    from api import schemas  # type: ignore
-    from api.services import auth as auth_service  # type: ignore
-
-    user_in = schemas.UserCreate(
-        email="admin@test.com", name="Admin", password="AdminPass123", role="admin"
-    )
-    user = auth_service.create_user(db, user_in)
-    token = auth_service.issue_access_token(user)
-    return user, token
-
-
-def create_user(db):
-    from api import schemas  # type: ignore
-    from api.services import auth as auth_service  # type: ignore
-
-    user_in = schemas.UserCreate(
-        email="user@test.com", name="User", password="ValidPass123", role="user"
-    )
-    user = auth_service.create_user(db, user_in)
-    token = auth_service.issue_access_token(user)
-    return user, token
-
-
-def test_ask_respects_user_collections(tmp_path):
-    app = create_app(tmp_path)
-    from api.db import SessionLocal  # type: ignore
+def test_ask_respects_user_collections(client, ephemeral_chroma, two_collections, admin_headers, user, user_headers, chat_session, monkeypatch):
     from api.services import rag as rag_service  # type: ignore
 
-    client = TestClient(app)
-    db = SessionLocal()
-    admin, admin_token = create_admin(db)
-    user, user_token = create_user(db)
-
     # Patch LLM-dependent functions
-    orig_rewrite = rag_service.rewrite_question
-    orig_generate = rag_service.generate_answer
-
     def fake_generate(question, contexts, temperature=None, history=None):
         citations = []
         for c in contexts:
@@ -92,40 +35,28 @@ def test_ask_respects_user_collections(tmp_path):
             )
         return {"answer": "ok", "citations": citations, "latency_ms": 0, "followups": []}
 
-    rag_service.rewrite_question = lambda q: q
-    rag_service.generate_answer = fake_generate
+    monkeypatch.setattr(rag_service, "rewrite_question", lambda q: q)
+    monkeypatch.setattr(rag_service, "generate_answer", fake_generate)
 
-    headers_admin = {"Authorization": f"Bearer {admin_token}"}
-    headers_user = {"Authorization": f"Bearer {user_token}"}
-
-    # Create two collections
-    cid1 = client.post(
-        "/api/admin/collections", json={"name": "C1"}, headers=headers_admin
-    ).json()["id"]
-    cid2 = client.post(
-        "/api/admin/collections", json={"name": "C2"}, headers=headers_admin
-    ).json()["id"]
+    cid1, cid2 = two_collections
 
     # Upload distinct documents
     client.post(
         f"/api/admin/collections/{cid1}/documents",
-        headers=headers_admin,
+        headers=admin_headers,
         files={"file": ("a.txt", b"apple", "text/plain")},
     )
     client.post(
         f"/api/admin/collections/{cid2}/documents",
-        headers=headers_admin,
+        headers=admin_headers,
         files={"file": ("b.txt", b"banana", "text/plain")},
     )
 
-    # Create chat session
-    sess = client.post("/api/chat/sessions", headers=headers_user).json()["id"]
-
     # Without assignments -> 403
     resp = client.post(
         "/api/ask",
-        json={"question": "apple", "session_id": sess},
-        headers=headers_user,
+        json={"question": "apple", "session_id": chat_session},
+        headers=user_headers,
     )
     assert resp.status_code == 403
 
@@ -133,14 +64,14 @@ def test_ask_respects_user_collections(tmp_path):
     client.put(
         f"/api/admin/users/{user.id}/collections",
         json={"assigned": [cid1]},
-        headers=headers_admin,
+        headers=admin_headers,
     )
 
     # Ask about document in allowed collection
     resp = client.post(
         "/api/ask",
-        json={"question": "apple", "session_id": sess},
-        headers=headers_user,
+        json={"question": "apple", "session_id": chat_session},
+        headers=user_headers,
     )
     assert resp.status_code == 200
     cids = {c["collection_id"] for c in resp.json()["citations"]}
@@ -150,15 +81,12 @@ def test_ask_respects_user_collections(tmp_path):
     client.put(
         f"/api/admin/users/{user.id}/collections",
         json={"assigned": []},
-        headers=headers_admin,
+        headers=admin_headers,
     )
     resp = client.post(
         "/api/ask",
-        json={"question": "apple", "session_id": sess},
-        headers=headers_user,
+        json={"question": "apple", "session_id": chat_session},
+        headers=user_headers,
     )
     assert resp.status_code == 403
 
-    rag_service.rewrite_question = orig_rewrite
-    rag_service.generate_answer = orig_generate
-
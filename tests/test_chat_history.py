@@ -1,93 +1,42 @@
-import os
-import sys
-from fastapi.testclient import TestClient
+from unittest.mock import MagicMock
 
-current_dir = os.path.dirname(__file__)
-project_root = os.path.abspath(os.path.join(current_dir, ".."))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
 
-
-def create_app(tmp_path):
-    os.environ.setdefault("OPENAI_API_KEY", "test")
-    os.environ.setdefault("JWT_SECRET", "secret")
-    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path/'app.db'}"
-    os.environ["COLLECTIONS_DIR"] = str(tmp_path / "collections")
-    os.environ["CHROMA_PERSIST_DIR"] = str(tmp_path / "chroma")
-    os.environ["LOGS_DIR"] = str(tmp_path / "logs")
-    import importlib
-    import api.config as config  # type: ignore
-    import api.db as db  # type: ignore
-    import rag.retriever as retriever  # type: ignore
-    import rag.answerer as answerer  # type: ignore
-    import api.services.docs as docs  # type: ignore
-    import api.query_logger as qlog  # type: ignore
-
-    importlib.reload(config)
-    importlib.reload(db)
-    importlib.reload(retriever)
-    importlib.reload(answerer)
-    importlib.reload(docs)
-    importlib.reload(qlog)
-    main = importlib.import_module("api.main")  # type: ignore
-    importlib.reload(main)
-    return main.create_app()
-
-
-def create_admin(db):
-    from api import schemas  # type: ignore
-    from api.services import auth as auth_service  # type: ignore
-
-    user_in = schemas.UserCreate(
-        email="admin@test.com", name="Admin", password="AdminPass123", role="admin"
-    )
-    user = auth_service.create_user(db, user_in)
-    token = auth_service.issue_access_token(user)
-    return user, token
-
-
-def test_chat_history_and_context(tmp_path):
-    app = create_app(tmp_path)
-    from api.db import SessionLocal  # type: ignore
+def test_chat_history_and_context(client, db_session, admin, admin_headers, monkeypatch):
     from api import models
     from api.services import docs as docs_service  # type: ignore
     from api.services import rag as rag_service  # type: ignore
-    from rag import retriever as retriever_mod
     from rag import answerer as answerer_mod
 
-    client = TestClient(app)
-    db = SessionLocal()
-    admin, token = create_admin(db)
-
     coll = models.Collection(name="C1", description="", owner_id=admin.id)
-    db.add(coll)
-    db.commit(); db.refresh(coll)
-
-    docs_service.total_embeddings_for_collections = lambda db, ids: 1
-
-    class FakeRetriever:
-        def search(self, *args, **kwargs):
-            return []
-
-    retriever_mod.Retriever = FakeRetriever
-    answerer_mod.rewrite_question = lambda q: q
-    answerer_mod.generate_answer = lambda q, res, temperature=None, history=None: {
-        "answer": "A1",
-        "citations": [],
-        "latency_ms": 0,
-    }
-    rag_service.rewrite_question = answerer_mod.rewrite_question
-    rag_service.generate_answer = answerer_mod.generate_answer
-
-    sess = client.post(
-        "/api/chat/sessions",
-        headers={"Authorization": f"Bearer {token}"},
+    db_session.add(coll)
+    db_session.commit(); db_session.refresh(coll)
+
+    monkeypatch.setattr(docs_service, "total_embeddings_for_collections", lambda db, ids: 1)
+
+    retriever_cls = MagicMock()
+    retriever_cls.return_value.search.return_value = []
+    monkeypatch.setattr(rag_service, "Retriever", retriever_cls)
+    monkeypatch.setattr(answerer_mod, "rewrite_question", lambda q: q)
+    monkeypatch.setattr(
+        answerer_mod,
+        "generate_answer",
+        lambda q, res, temperature=None, history=None: {
+            "answer": "A1",
+            "citations": [],
+            "latency_ms": 0,
+        },
     )
-    session_id = sess.json()["id"]
+    monkeypatch.setattr(rag_service, "rewrite_question", answerer_mod.rewrite_question)
+    monkeypatch.setattr(rag_service, "generate_answer", answerer_mod.generate_answer)
+
+    chat = models.ChatSession(user_id=admin.id, session_title="New Chat")
+    db_session.add(chat)
+    db_session.commit()
+    session_id = chat.id
     r1 = client.post(
         "/api/ask",
         json={"question": "First question?", "session_id": session_id},
-        headers={"Authorization": f"Bearer {token}"},
+        headers=admin_headers,
     )
     assert r1.status_code == 200
 
@@ -97,19 +46,19 @@ def test_chat_history_and_context(tmp_path):
         captured["history"] = history
         return {"answer": "A2", "citations": [], "latency_ms": 0}
 
-    answerer_mod.generate_answer = capture
-    rag_service.generate_answer = capture
+    monkeypatch.setattr(answerer_mod, "generate_answer", capture)
+    monkeypatch.setattr(rag_service, "generate_answer", capture)
 
     r2 = client.post(
         "/api/ask",
         json={"question": "Second question?", "session_id": session_id},
-        headers={"Authorization": f"Bearer {token}"},
+        headers=admin_headers,
     )
     assert r2.status_code == 200
 
     hist_resp = client.get(
         f"/api/chat/sessions/{session_id}/history",
-        headers={"Authorization": f"Bearer {token}"},
+        headers=admin_headers,
     )
     assert hist_resp.status_code == 200
     history = hist_resp.json()
@@ -118,4 +67,3 @@ def test_chat_history_and_context(tmp_path):
     assert history[1]["query"] == "Second question?"
     assert captured["history"][0]["question"] == "First question?"
     assert captured["history"][0]["answer"] == "A1"
-    db.close()
@@ -2,27 +2,21 @@
 Unit tests for the chunker utility functions.
 
 These tests ensure that the chunker preserves page metadata and produces
-non-empty chunks.  The test manipulates sys.path at runtime to import the
-module from the project directory.
+non-empty chunks.  The project root is put on sys.path by conftest.py.
 """
-import os
-import sys
+import pytest
 
-# Add the project root to sys.path so we can import the rag package.  The
-# directory structure uses a hyphen in the name (data-nucleus) which is not a valid
-# Python identifier, so we append the path directly.
-current_dir = os.path.dirname(__file__)
-project_root = os.path.abspath(os.path.join(current_dir, ".."))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
+from rag import chunker  # type: ignore
 
-from rag import chunker  # type: ignore  # noqa: E402
+_TEXT = "This is a test sentence. " * 200
 
 
-def test_chunker_preserves_page_and_chunk_id():
-    text = "This is a test sentence. " * 200
-    pages = [(1, text), (2, text)]
-    chunks = chunker.chunk_pages(pages, tokens_per_chunk=50, overlap=10)
+@pytest.fixture(scope="module")
+def chunks():
+    return chunker.chunk_pages([(1, _TEXT), (2, _TEXT)], tokens_per_chunk=50, overlap=10)
+
+
+def test_chunker_preserves_page_and_chunk_id(chunks):
     page_nums = {c["page"] for c in chunks}
     assert page_nums == {1, 2}
     for c in chunks:
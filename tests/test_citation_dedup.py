@@ -1,25 +1,34 @@
-import os
-import sys
 import types
 
-current_dir = os.path.dirname(__file__)
-project_root = os.path.abspath(os.path.join(current_dir, ".."))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
+import pytest
 
-os.environ.setdefault("OPENAI_API_KEY", "test")
-os.environ.setdefault("JWT_SECRET", "secret")
+from rag import answerer  # type: ignore
 
-from rag import answerer  # type: ignore  # noqa: E402
 
-def test_dedup_and_ranking():
-    citations = [
-        {"doc_id": 1, "title": "A", "page": 1, "chunk_id": "1a", "score": 0.2, "collection_id":1, "collection_name":"C", "snippet":"a"},
-        {"doc_id": 1, "title": "A", "page": 1, "chunk_id": "1b", "score": 0.8, "collection_id":1, "collection_name":"C", "snippet":"b"},
-        {"doc_id": 2, "title": "B", "page": 1, "chunk_id": "2a", "score": 0.5, "collection_id":1, "collection_name":"C", "snippet":"c"},
-    ]
+def _cit(doc_id, page, chunk_id, score, title="A"):
+    return {"doc_id": doc_id, "title": title, "page": page, "chunk_id": chunk_id, "score": score, "collection_id":1, "collection_name":"C", "snippet":"s"}
+
+
+@pytest.mark.parametrize(
+    "citations, expected",
+    [
+        # best chunk per (doc, page) wins, then sorted by score
+        (
+            [_cit(1, 1, "1a", 0.2), _cit(1, 1, "1b", 0.8), _cit(2, 1, "2a", 0.5, "B")],
+            [("1b", 0.8), ("2a", 0.5)],
+        ),
+        # different pages of one document are kept apart
+        (
+            [_cit(1, 1, "1a", 0.3), _cit(1, 2, "1c", 0.9)],
+            [("1c", 0.9), ("1a", 0.3)],
+        ),
+        # citations without a chunk id fall back to "doc:page"
+        (
+            [_cit(3, 4, None, 0.4), _cit(3, 4, None, 0.1)],
+            [("3:4", 0.4)],
+        ),
+    ],
+)
+def test_dedup_and_ranking(citations, expected):
     ordered = answerer._rank_dedupe(citations)
-    assert len(ordered) == 2
-    assert ordered[0]["id"] == "1b"
-    assert ordered[0]["score"] == 0.8
-    assert ordered[1]["id"] == "2a"
+    assert [(c["id"], c["score"]) for c in ordered] == expected
@@ -1,40 +1,59 @@
-import os
-import sys
-from pathlib import Path
-
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from api import models, schemas  # type: ignore
+from api.services import collections as collections_service  # type: ignore
+from api.storage import LocalStorageAdapter  # type: ignore
+from fastapi import HTTPException  # type: ignore
 
-# Ensure project root in path
-current_dir = os.path.dirname(__file__)
-project_root = os.path.abspath(os.path.join(current_dir, ".."))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
 
-os.environ.setdefault("OPENAI_API_KEY", "test")
-os.environ.setdefault("JWT_SECRET", "secret")
+@pytest.fixture(scope="module")
+def engine():
+    """One in-memory schema, plus an admin, shared by every test here."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
 
-from api import models, schemas  # type: ignore  # noqa: E402
-from api.services import collections as collections_service  # type: ignore  # noqa: E402
-from api.storage import LocalStorageAdapter  # type: ignore  # noqa: E402
-from fastapi import HTTPException  # type: ignore  # noqa: E402
+    # pysqlite defers BEGIN on its own, which breaks SAVEPOINT; take over
+    # transaction control as the SQLAlchemy docs recommend.
+    @event.listens_for(engine, "connect")
+    def _no_pysqlite_begin(dbapi_conn, _record):
+        dbapi_conn.isolation_level = None
 
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
 
-def setup_db():
-    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     models.Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
-    user = models.User(email="admin@example.com", name="Admin", password_hash="hash", role="admin")
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return db, user
+    with Session(engine) as db:
+        db.add(models.User(email="admin@example.com", name="Admin", password_hash="hash", role="admin"))
+        db.commit()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    """A session whose commits become SAVEPOINTs, rolled back after the test."""
+    conn = engine.connect()
+    trans = conn.begin()
+    session = Session(bind=conn, autoflush=False, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        trans.rollback()
+        conn.close()
+
+
+@pytest.fixture
+def user(db):
+    return db.query(models.User).filter_by(email="admin@example.com").one()
 
 
-def test_service_crud(tmp_path):
-    db, user = setup_db()
+def test_service_crud(db, user, tmp_path):
     storage = LocalStorageAdapter(str(tmp_path))
     coll_in = schemas.CollectionCreate(name="A", description="d")
     coll = collections_service.create_collection(db, user, coll_in, storage)
@@ -0,0 +1,11 @@
+import pytest
+from pydantic import ValidationError
+
+from api.config import Settings  # type: ignore
+
+
+@pytest.mark.parametrize("rounds", [3, 32])
+def test_password_hash_rounds_must_be_a_bcrypt_cost(rounds):
+    with pytest.raises(ValidationError):
+        Settings(_env_file=None, PASSWORD_HASH_ROUNDS=rounds)
+
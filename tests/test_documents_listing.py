@@ -1,44 +1,27 @@
-import io
-from fastapi.testclient import TestClient
-from pypdf import PdfWriter
-
-from test_document_lifecycle import create_app, create_admin
-
-
-def test_documents_search_includes_collections(tmp_path):
-    app = create_app(tmp_path)
-    from api.db import SessionLocal  # type: ignore
+def test_documents_search_includes_collections(client, db_session, ephemeral_chroma, admin, admin_headers, blank_pdf_bytes):
     from api import models  # type: ignore
 
-    client = TestClient(app)
-    db = SessionLocal()
-    token, admin_id = create_admin(db)
-    headers = {"Authorization": f"Bearer {token}"}
-
-    c1 = models.Collection(name="A", description="", owner_id=admin_id)
-    c2 = models.Collection(name="B", description="", owner_id=admin_id)
-    db.add_all([c1, c2])
-    db.commit()
-    db.refresh(c1); db.refresh(c2)
-
-    writer = PdfWriter(); writer.add_blank_page(width=72, height=72)
-    pdf_io = io.BytesIO(); writer.write(pdf_io); pdf_bytes = pdf_io.getvalue()
+    c1 = models.Collection(name="A", description="", owner_id=admin.id)
+    c2 = models.Collection(name="B", description="", owner_id=admin.id)
+    db_session.add_all([c1, c2])
+    db_session.commit()
+    db_session.refresh(c1); db_session.refresh(c2)
 
     resp = client.post(
         f"/api/admin/collections/{c1.id}/documents",
-        headers=headers,
-        files={"file": ("a.pdf", pdf_bytes, "application/pdf")},
+        headers=admin_headers,
+        files={"file": ("a.pdf", blank_pdf_bytes, "application/pdf")},
     )
     assert resp.status_code == 200
     doc_id = resp.json()["uploads"][0]["document_id"]
 
     client.post(
         f"/api/admin/collections/{c2.id}/documents/link",
-        headers=headers,
+        headers=admin_headers,
         json={"document_id": doc_id},
     )
 
-    resp = client.get("/api/admin/documents", headers=headers)
+    resp = client.get("/api/admin/documents", headers=admin_headers)
     assert resp.status_code == 200
     items = resp.json()["items"]
     assert len(items) == 1
@@ -0,0 +1,16 @@
+import uuid
+
+from rag.embeddings import EmbeddingClient  # type: ignore
+
+
+def test_mutating_a_returned_vector_does_not_touch_the_cache():
+    client = EmbeddingClient()
+    text = uuid.uuid4().hex
+    first = client.embed_query(text)
+    expected = list(first)
+    first[0] += 1.0
+    first.append(9.0)
+    again = client.embed_query(text)  # served from the in-process LRU
+    assert again == expected
+    again[:] = []
+    assert client.embed([text]) == [expected]
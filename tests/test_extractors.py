@@ -1,29 +1,20 @@
-import os
-import sys
 from pathlib import Path
 
-current_dir = os.path.dirname(__file__)
-project_root = os.path.abspath(os.path.join(current_dir, ".."))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
-
-from rag import chunker  # type: ignore
+# Checked-in sample files; sample.docx holds one paragraph, "Hello from docx".
+FIXTURES = Path(__file__).parent / "fixtures"
 
 
 def test_extract_text_from_txt(tmp_path):
+    from rag import chunker  # type: ignore
+
     p = tmp_path / "sample.txt"
     p.write_text("Hello\nworld")
     pages = chunker.extract_text_from_txt(str(p))
     assert pages == [(1, "Hello world")]
 
 
-def test_extract_text_from_docx(tmp_path):
-    p = tmp_path / "sample.docx"
-    import docx  # type: ignore
-
-    doc = docx.Document()
-    doc.add_paragraph("Hello from docx")
-    doc.save(str(p))
+def test_extract_text_from_docx():
+    from rag import chunker  # type: ignore
 
-    pages = chunker.extract_text_from_docx(str(p))
+    pages = chunker.extract_text_from_docx(str(FIXTURES / "sample.docx"))
     assert pages == [(1, "Hello from docx")]
@@ -1,16 +1,35 @@
-from fastapi.testclient import TestClient
-from api.main import app
+import pytest
 
-client = TestClient(app)
 
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("/api/health", {200}),
+        ("/api/metrics", {200}),
+        ("/api/ready", {200, 503}),
+        # Endpoint exists and requires authentication
+        ("/api/auth/me", {401}),
+    ],
+)
+def test_endpoint_status(client, path, expected):
+    assert client.get(path).status_code in expected
 
-def test_health_endpoints():
-    assert client.get('/api/health').status_code == 200
-    assert client.get('/api/metrics').status_code == 200
-    assert client.get('/api/ready').status_code in (200, 503)
 
+def test_health_details_reports_cache_counters(client):
+    body = client.get("/api/health/details").json()
+    assert set(body["caches"]["search_results"]) == {"hits", "misses", "size"}
 
-def test_auth_me_requires_auth():
-    # Endpoint exists and requires authentication
-    resp = client.get('/api/auth/me')
-    assert resp.status_code == 401
+
+def test_health_details_embedding_counters_move(client):
+    import uuid
+
+    from rag.embeddings import get_embedder  # type: ignore
+
+    embedder = get_embedder()
+    before = client.get("/api/health/details").json()["caches"]["embeddings"]
+    text = uuid.uuid4().hex
+    embedder.embed_query(text)
+    embedder.embed_query(text)
+    after = client.get("/api/health/details").json()["caches"]["embeddings"]
+    assert after["misses"] == before["misses"] + 1
+    assert after["memory_hits"] == before["memory_hits"] + 1
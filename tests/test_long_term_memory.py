@@ -0,0 +1,13 @@
+from rag.long_term_memory import LongTermMemory, MemoryEntry  # type: ignore
+from rag.sql_store import SqlStore  # type: ignore
+
+
+def test_upsert_accepts_non_string_ids(tmp_path):
+    store = SqlStore(tmp_path / "memory.sqlite")
+    ltm = LongTermMemory(store)
+    entry = MemoryEntry(text="pumps need priming", session_id=7, user_id=42)
+    ltm.upsert([entry])
+    ltm.upsert([entry])
+    rows = store.all_memories()
+    assert len(rows) == 1
+    assert str(rows[0]["user_id"]) == "42"
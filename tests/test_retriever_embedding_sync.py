@@ -1,26 +1,134 @@
+import pytest
+
 from rag import retriever
 
 
-def test_retriever_handles_mismatched_embedding(monkeypatch):
-    # dummy client and collection with wrong embedding size
-    class DummyCollection:
-        def query(self, **kwargs):
-            return {
-                "documents": [["doc"]],
-                "metadatas": [[{"chunk_id": "1"}]],
-                "embeddings": [[[0.1, 0.2]]],
-                "distances": [[0.0]],
-            }
+@pytest.fixture(autouse=True, scope="module")
+def _dense_only():
+    # Every test here stubs the vector store; keep BM25 and the reranker off.
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(retriever.settings, "use_bm25", False)
+        mp.setattr(retriever.settings, "use_reranker", False)
+        yield
+
+
+class FakeCollection:
+    """A Chroma "docs" collection that always returns the same hits."""
+
+    def __init__(self, chunk_ids, texts, distances, embeddings=None, with_ids=True, on_query=None):
+        self.chunk_ids = chunk_ids
+        self.texts = texts
+        self.distances = distances
+        self.embeddings = embeddings
+        self.with_ids = with_ids
+        self.on_query = on_query
+        self.calls = []
+
+    def query(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.on_query:
+            self.on_query()
+        res = {
+            "documents": [list(self.texts)],
+            "metadatas": [[{"chunk_id": cid} for cid in self.chunk_ids]],
+            "distances": [list(self.distances)],
+        }
+        if self.with_ids:
+            res["ids"] = [list(self.chunk_ids)]
+        if self.embeddings is not None:
+            res["embeddings"] = [self.embeddings]
+        return res
+
+    def get(self, ids, include):
+        return {"ids": list(self.chunk_ids), "embeddings": self.embeddings}
+
+
+class FakeClient:
+    def __init__(self, collection):
+        self.collection = collection
 
-    class DummyClient:
-        def get_or_create_collection(self, name: str):
-            return DummyCollection()
+    def get_or_create_collection(self, name: str):
+        return self.collection
 
-    monkeypatch.setattr(retriever, "get_collection_client", lambda cid: DummyClient())
-    monkeypatch.setattr(retriever.settings, "use_bm25", False)
-    monkeypatch.setattr(retriever.settings, "use_reranker", False)
+
+@pytest.fixture
+def fake_collection(monkeypatch):
+    """Serve every collection id from a :class:`FakeCollection` built from the arguments."""
+
+    def install(*args, **kwargs):
+        coll = FakeCollection(*args, **kwargs)
+        monkeypatch.setattr(retriever, "get_collection_client", lambda cid: FakeClient(coll))
+        retriever.invalidate_results()
+        return coll
+
+    return install
+
+
+def test_retriever_handles_mismatched_embedding(fake_collection):
+    # embeddings are 2-d while query vectors are not
+    fake_collection(
+        ["1", "2"], ["doc", "other"], [0.0, 0.5],
+        embeddings=[[0.1, 0.2], [0.2, 0.1]], with_ids=False,
+    )
 
     r = retriever.Retriever()
     out = r.search("hello", allowed_collections=[1], k=1)
     assert out and out[0]["metadata"]["chunk_id"] == "1"
 
+
+def test_search_results_are_cached_until_invalidated(fake_collection, monkeypatch):
+    coll = fake_collection(["7"], ["doc"], [0.1])
+    monkeypatch.setattr(retriever.settings, "search_result_cache", True)
+
+    r = retriever.Retriever()
+    first = r.search("cached  query", allowed_collections=[3], k=1)
+    first.append({"text": "memory", "metadata": {}, "score": 0.0})
+    second = r.search("cached query", allowed_collections=[3], k=1)
+    assert len(coll.calls) == 1
+    assert [h["text"] for h in second] == ["doc"]
+
+    retriever.invalidate_results(3)
+    r.search("cached query", allowed_collections=[3], k=1)
+    assert len(coll.calls) == 2
+
+    # with the cache switched off (the default) every search hits the index
+    monkeypatch.setattr(retriever.settings, "search_result_cache", False)
+    r.search("cached query", allowed_collections=[3], k=1)
+    r.search("cached query", allowed_collections=[3], k=1)
+    assert len(coll.calls) == 4
+
+
+def test_search_racing_an_invalidation_is_not_cached(fake_collection, monkeypatch):
+    # the collection is re-indexed while each search is in flight
+    coll = fake_collection(["8"], ["old"], [0.1], on_query=lambda: retriever.invalidate_results(4))
+    monkeypatch.setattr(retriever.settings, "search_result_cache", True)
+
+    r = retriever.Retriever()
+    r.search("racing query", allowed_collections=[4], k=1)
+    r.search("racing query", allowed_collections=[4], k=1)
+    assert len(coll.calls) == 2
+    assert retriever.result_cache_stats()["size"] == 0
+
+
+def test_reranker_is_skipped_when_candidates_fit_in_k(fake_collection, monkeypatch):
+    fake_collection(["1", "2"], ["first", "second"], [0.2, 0.4])
+    reranked = []
+
+    def fake_rerank(query, texts):
+        reranked.append(texts)
+        return [float(i) for i in range(len(texts))]
+
+    monkeypatch.setattr(retriever.settings, "use_reranker", True)
+    monkeypatch.setattr(retriever, "rerank", fake_rerank)
+
+    r = retriever.Retriever()
+    # both candidates fit: vector scores are returned as-is, no rerank
+    out = r.search("skip", allowed_collections=[5], k=2, lambda_mult=None)
+    assert reranked == []
+    assert [h["text"] for h in out] == ["first", "second"]
+    assert [round(h["score"], 6) for h in out] == [0.8, 0.6]
+
+    # one slot for two candidates: the cross-encoder decides and scores
+    out = r.search("skip", allowed_collections=[5], k=1, lambda_mult=None)
+    assert reranked == [["first", "second"]]
+    assert [(h["text"], h["score"]) for h in out] == [("second", 1.0)]
@@ -0,0 +1,26 @@
+from rag import retriever  # type: ignore
+
+
+def test_mmr_prefers_diverse_candidates():
+    vecs = [[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]]
+    scores = [0.9, 0.85, 0.5]
+    out = retriever._mmr([1.0, 0.0], vecs, scores, k=2, lambda_mult=0.5)
+    assert out == [0, 2]
+
+
+def test_mmr_handles_empty_and_zero_k():
+    assert retriever._mmr([1.0], [], [], k=3) == []
+    assert retriever._mmr([1.0], [[1.0]], [1.0], k=0) == []
+
+
+def test_mmr_accepts_prenormalized_vectors():
+    vecs = [[3.0, 0.0], [2.97, 0.03], [0.0, 5.0]]
+    scores = [0.9, 0.85, 0.5]
+    unit = retriever._normalize_rows(vecs)
+    assert retriever._mmr([1.0, 0.0], unit, scores, k=2, normalized=True) == [0, 2]
+    assert retriever._mmr([1.0, 0.0], vecs, scores, k=2) == [0, 2]
+
+
+def test_mmr_returns_score_order_when_keeping_everything():
+    vecs = [[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]]
+    assert retriever._mmr([1.0, 0.0], vecs, [0.1, 0.9, 0.5], k=5) == [1, 2, 0]
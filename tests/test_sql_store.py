@@ -0,0 +1,155 @@
+from rag.sql_store import SqlStore  # type: ignore
+
+
+def _store(tmp_path):
+    return SqlStore(tmp_path / "memory.sqlite")
+
+
+def test_most_similar_interaction_picks_best_match(tmp_path):
+    store = _store(tmp_path)
+    store.add_interaction("s1", "hello", "a1", [1.0, 0.0, 0.0])
+    store.add_interaction("s1", "world", "a2", [0.0, 1.0, 0.0])
+    score, item = store.most_similar_interaction("s1", [0.1, 1.0, 0.0])
+    assert item["answer"] == "a2"
+    assert abs(score - 0.995) < 1e-3
+    assert store.most_similar_interaction("other", [1.0, 0.0, 0.0]) is None
+
+
+def test_public_readers_return_plain_lists(tmp_path):
+    import json
+
+    store = _store(tmp_path)
+    store.add_interaction("s1", "hello", "a1", [1.0, 0.0])
+    store.upsert_memories([{"id": "a", "text": "A", "emb": [0.5, 0.25]}])
+    (recent,) = store.recent_interactions("s1", n=1)
+    _, best = store.most_similar_interaction("s1", [1.0, 0.0])
+    (memory,) = store.all_memories()
+    assert recent["q_vec"] == best["q_vec"] == [1.0, 0.0]
+    assert memory["emb"] == [0.5, 0.25]
+    json.dumps([recent, best, memory])
+
+
+def test_topk_similar_memories_orders_by_cosine(tmp_path):
+    store = _store(tmp_path)
+    store.upsert_memories([
+        {"id": "a", "text": "A", "emb": [1.0, 0.0]},
+        {"id": "b", "text": "B", "emb": [0.0, 1.0]},
+        {"id": "c", "text": "C", "emb": []},
+        {"id": "d", "text": "D", "emb": [1.0, 1.0]},
+    ])
+    top = store.topk_similar_memories([1.0, 0.1], k=2)
+    assert [item["id"] for _, item in top] == ["a", "d"]
+    everything = store.topk_similar_memories([1.0, 0.1], k=10)
+    assert [item["id"] for _, item in everything] == ["a", "d", "b", "c"]
+    assert everything[-1][0] == 0.0
+
+
+def test_legacy_json_vectors_are_migrated(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "memory.sqlite"
+    con = sqlite3.connect(str(path))
+    con.execute(
+        "CREATE TABLE memories(id TEXT PRIMARY KEY, text TEXT, session_id TEXT,"
+        " user_id TEXT, tags TEXT, importance REAL, emb TEXT)"
+    )
+    con.execute(
+        "INSERT INTO memories VALUES('m1', 'old', NULL, NULL, '[]', 0.5, '[0.0, 2.0]')"
+    )
+    con.commit()
+    con.close()
+
+    store = SqlStore(path)
+    (score, item), = store.topk_similar_memories([0.0, 1.0], k=1)
+    assert item["id"] == "m1" and abs(score - 1.0) < 1e-6
+    con = sqlite3.connect(str(path))
+    assert con.execute("SELECT typeof(emb) FROM memories").fetchone()[0] == "blob"
+    con.close()
+
+
+def test_quantized_search_matches_exact_ranking(tmp_path):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    vecs = rng.normal(size=(50, 64)).astype(np.float32)
+    entries = [{"id": f"m{i}", "text": str(i), "emb": v.tolist()} for i, v in enumerate(vecs)]
+    exact = SqlStore(tmp_path / "memory.sqlite", quantized=False)
+    exact.upsert_memories(entries)
+    quant = SqlStore(tmp_path / "memory.sqlite", quantized=True)
+    q = vecs[7] + 0.1 * rng.normal(size=64).astype(np.float32)
+    a = exact.topk_similar_memories(q.tolist(), k=5)
+    b = quant.topk_similar_memories(q.tolist(), k=5)
+    assert a[0][1]["id"] == b[0][1]["id"] == "m7"
+    for (sa, _), (sb, _) in zip(a, b):
+        assert abs(sa - sb) < 0.02
+
+
+def test_quantized_scores_agree_around_min_sim_cutoff(tmp_path):
+    import numpy as np
+
+    from rag.config import MemoryConfig  # type: ignore
+
+    cutoff = MemoryConfig().long_min_sim
+    rng = np.random.default_rng(1)
+    q = rng.normal(size=256)
+    q /= np.linalg.norm(q)
+    entries = []
+    for i, delta in enumerate((-0.01, -0.005, -0.002, 0.002, 0.005, 0.01)):
+        noise = rng.normal(size=256)
+        noise -= (noise @ q) * q
+        noise /= np.linalg.norm(noise)
+        target = cutoff + delta
+        vec = target * q + np.sqrt(1 - target**2) * noise
+        entries.append({"id": f"m{i}", "text": str(i), "emb": vec.tolist()})
+    SqlStore(tmp_path / "memory.sqlite").upsert_memories(entries)
+
+    def above(quantized):
+        store = SqlStore(tmp_path / "memory.sqlite", quantized=quantized)
+        return {item["id"] for score, item in store.topk_similar_memories(q.tolist(), k=10) if score >= cutoff}
+
+    assert above(False) == {"m3", "m4", "m5"}
+    assert above(True) == above(False)
+
+
+def test_interactions_are_trimmed_per_session(tmp_path):
+    store = _store(tmp_path)
+    for i in range(35):
+        store.add_interaction("s1", f"q{i}", f"a{i}", [1.0, 0.0])
+    store.add_interaction("s2", "other", "a", [1.0, 0.0])
+    kept = store.recent_interactions("s1", n=100)
+    assert len(kept) == 30
+    assert kept[0]["user_input"] == "q34" and kept[-1]["user_input"] == "q5"
+    assert len(store.recent_interactions("s2", n=100)) == 1
+
+
+def test_memory_index_is_rebuilt_after_writes(tmp_path):
+    store = _store(tmp_path)
+    store.upsert_memories([{"id": "a", "text": "A", "emb": [1.0, 0.0]}])
+    assert [i["id"] for _, i in store.topk_similar_memories([0.0, 1.0], k=5)] == ["a"]
+    # a second handle on the same file writes; the first must notice
+    SqlStore(tmp_path / "memory.sqlite").upsert_memories([{"id": "b", "text": "B", "emb": [0.0, 1.0]}])
+    top = store.topk_similar_memories([0.0, 1.0], k=5)
+    assert [i["id"] for _, i in top] == ["b", "a"]
+    assert store.topk_similar_memories([], k=5)[0][0] == 0.0
+
+
+def test_repeat_searches_reuse_the_memory_matrix(tmp_path):
+    store = _store(tmp_path)
+    store.upsert_memories([{"id": "a", "text": "A", "emb": [1.0, 0.0]}])
+    statements = []
+    connect = store._conn
+
+    def traced():
+        con = connect()
+        con.set_trace_callback(statements.append)
+        return con
+
+    store._conn = traced
+    store.topk_similar_memories([1.0, 0.0], k=1)
+    store.topk_similar_memories([0.0, 1.0], k=1)
+    assert sum("FROM memories" in sql for sql in statements) == 1
+
+    store.upsert_memories([{"id": "b", "text": "B", "emb": [0.0, 1.0]}])
+    (score, item), = store.topk_similar_memories([0.0, 1.0], k=1)
+    assert item["id"] == "b"
+    assert sum("FROM memories" in sql for sql in statements) == 2